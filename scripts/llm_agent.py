@@ -1,41 +1,158 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Mapping, Optional
 from datetime import datetime
 import openai
-from dataclasses import dataclass
+import msgspec
+from functools import lru_cache
+from types import MappingProxyType
 import re
+from collections import deque
+import numpy as np
+
+from numeric_summary import summarize
+from semantic_cache import BatchEmbedder, SemanticCache
+from token_count import count_tokens
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class MCPToolCall:
+def _json_dumps_indented(obj: Any) -> str:
+    """Serialize JSON with 2-space indentation, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+class MCPToolCall(msgspec.Struct, frozen=True):
     """Represents a call to an MCP tool"""
     tool_name: str
     arguments: Dict[str, Any]
     call_id: str
 
-@dataclass
-class MCPToolResponse:
+class MCPToolResponse(msgspec.Struct, frozen=True):
     """Response from an MCP tool"""
     call_id: str
     success: bool
     data: Any = None
-    error: str = None
-    metadata: Dict[str, Any] = None
-
-class ARGOLLMAgent:
-    """LLM Agent that uses MCP Server tools to answer ARGO oceanographic queries"""
-    
-    def __init__(self, openai_api_key: str, model: str = "gpt-4"):
-        self.client = openai.OpenAI(api_key=openai_api_key)
-        self.model = model
-        self.conversation_history = []
-        
-        self.system_prompt = """You are an expert oceanographic data analyst specializing in ARGO float data. 
+    error: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    raw_json: Optional[str] = None  # Undecoded MCP response body, when available
+
+# Keyword -> filter tables for _analyze_query_for_filters, in priority order
+_REGION_FILTERS = {
+    'indian ocean': {'minLat': -40, 'maxLat': 30, 'minLon': 20, 'maxLon': 120},
+    'arabian sea': {'minLat': 10, 'maxLat': 25, 'minLon': 50, 'maxLon': 80},
+    'bay of bengal': {'minLat': 5, 'maxLat': 25, 'minLon': 80, 'maxLon': 100},
+}
+
+_TEMPERATURE_FILTERS = {
+    'warm': {'minTemp': 28},
+    'cold': {'maxTemp': 15},
+}
+
+_YEAR_FILTERS = {
+    '2023': {'startDate': '2023-01-01', 'endDate': '2023-12-31'},
+    '2024': {'startDate': '2024-01-01', 'endDate': '2024-12-31'},
+}
+
+_FILTER_KEYWORD_RE = re.compile(
+    '|'.join(re.escape(keyword) for keyword in (*_REGION_FILTERS, *_TEMPERATURE_FILTERS, *_YEAR_FILTERS))
+)
+
+_TOOL_CALL_RE = re.compile(r'TOOL_CALL:\s*')
+_JSON_DECODER = json.JSONDecoder()
+
+# Canned payloads for the _simulate_* tool calls. Built once at import and
+# shared by every simulated response, so treat them as read-only.
+_SIMULATED_SQL_PROFILES = [
+    {
+        "id": 1,
+        "file": "D1901393_001.nc",
+        "date": "2023-06-15T12:00:00Z",
+        "lat": -5.2,
+        "lon": 67.8,
+        "mld": 45.5,
+        "thermoclinedepth": 120.3,
+        "salinitymindepth": 85.2,
+        "salinitymaxdepth": 200.1,
+        "meanstratification": 0.0045,
+        "ohc_0_200m": 2.8e9,
+        "surfacetemp": 28.5,
+        "surfacesal": 35.2,
+        "n_levels": 156,
+        "direction": "ascending"
+    },
+    {
+        "id": 2,
+        "file": "D1901394_002.nc", 
+        "date": "2023-07-20T12:00:00Z",
+        "lat": -8.1,
+        "lon": 72.3,
+        "mld": 32.8,
+        "thermoclinedepth": 95.7,
+        "salinitymindepth": 75.4,
+        "salinitymaxdepth": 180.6,
+        "meanstratification": 0.0052,
+        "ohc_0_200m": 3.1e9,
+        "surfacetemp": 29.2,
+        "surfacesal": 34.8,
+        "n_levels": 142,
+        "direction": "ascending"
+    }
+]
+
+_SIMULATED_SEMANTIC_PROFILES = [
+    {
+        "id": 3,
+        "file": "D1901395_003.nc",
+        "date": "2023-08-01T12:00:00Z",
+        "lat": -12.5,
+        "lon": 78.9,
+        "mld": 28.3,
+        "thermoclinedepth": 85.2,
+        "salinitymindepth": 65.1,
+        "salinitymaxdepth": 150.8,
+        "meanstratification": 0.0058,
+        "ohc_0_200m": 3.4e9,
+        "surfacetemp": 30.1,
+        "surfacesal": 34.5,
+        "n_levels": 138,
+        "direction": "ascending",
+        "summary": "SW Monsoon profile with shallow mixed layer, strong thermocline, typical Bay of Bengal characteristics with reduced surface salinity"
+    }
+]
+
+# Location search patches latitude/longitude per call
+_SIMULATED_LOCATION_PROFILE = {
+    "id": "argo_loc_001",
+    "platform_number": "1901396",
+    "date": "2023-03-01T12:00:00Z",
+    "surface_temp": 20.1,
+    "surface_sal": 36.5
+}
+
+_SIMULATED_DATE_RANGE_PROFILES = [
+    {
+        "id": "argo_date_001",
+        "platform_number": "1901397",
+        "latitude": 25.5,
+        "longitude": -80.2,
+        "date": "2023-06-15T12:00:00Z",
+        "surface_temp": 28.5,
+        "surface_sal": 36.8
+    }
+]
+
+# Static system prompt shared by every request. Keeping it byte-identical and
+# first in the message list lets the provider serve it from its prompt cache.
+SYSTEM_PROMPT = """You are an expert oceanographic data analyst specializing in ARGO float data. 
 
 ARGO DATABASE SCHEMA (argo_profiles table):
 - file: Profile file identifier (PRIMARY KEY)
@@ -97,80 +214,155 @@ RESPONSE GUIDELINES:
 When you need to use a tool, format your response as:
 TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
 
+# Routes requests that share SYSTEM_PROMPT to the same provider-side cache;
+# bump the version whenever the prompt text changes.
+PROMPT_CACHE_KEY = "argo-system-v1"
+
+class ARGOLLMAgent:
+    """LLM Agent that uses MCP Server tools to answer ARGO oceanographic queries"""
+    
+    def __init__(self, openai_api_key: str, model: str = "gpt-4"):
+        self.client = openai.AsyncOpenAI(api_key=openai_api_key)
+        self.model = model
+        self.embedding_model = "text-embedding-3-small"
+        # Bounded so long sessions don't resend an ever-growing history
+        self.conversation_history = deque(maxlen=20)
+        self.max_history_tokens = 4000
+        # Query embedding -> (filters, response); a hit needs the same MCP filters,
+        # since "warm ... 2023" and "cold ... 2024" can embed almost identically
+        self.semantic_cache = SemanticCache(dim=1536, threshold=0.9, ttl=300, max_size=1000)
+        self.embedder = BatchEmbedder(self.client, self.embedding_model)
+        
+        # MCP client and its HTTP session are held open across queries;
+        # see connect()/disconnect()
+        self.mcp_config = None
+        self._mcp = None
+        self._http_session = None
+        
+        self.system_prompt = SYSTEM_PROMPT
+
+    async def __aenter__(self):
+        """Async context manager entry"""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.disconnect()
+
+    async def connect(self):
+        """Open the MCP client once for the lifetime of the agent.
+        
+        Long-lived callers (REPL, web session) should call this at startup and
+        disconnect() at shutdown, or use the agent as an async context manager.
+        process_query() connects lazily if this was not done.
+        """
+        # Import MCP client here to avoid circular imports
+        from mcp_client import MCPClient, MCPClientConfig, SharedSession
+        
+        if self._mcp is None:
+            config = self.mcp_config or MCPClientConfig()
+            self._http_session = SharedSession.acquire(config)
+            self._mcp = MCPClient(config, session=self._http_session, embedder=self.embedder)
+
+    async def disconnect(self):
+        """Drop the MCP client, release the shared HTTP session, and stop the embedding batcher"""
+        from mcp_client import SharedSession
+        
+        await self.embedder.close()
+        self._mcp = None
+        if self._http_session is not None:
+            self._http_session = None
+            await SharedSession.release()
+
+    async def _get_mcp_client(self):
+        """Return the shared MCP client, connecting on first use"""
+        if self._mcp is None:
+            await self.connect()
+        return self._mcp
+
     async def process_query(self, user_query: str) -> str:
         """Process a user query and return a comprehensive response"""
         try:
-            # Import MCP client here to avoid circular imports
-            from mcp_client import MCPClient, MCPClientConfig
-            
-            # Analyze query and fetch relevant data
+            # Analyze query for the filters to fetch relevant data with
             query_filters = self._analyze_query_for_filters(user_query)
             
-            async with MCPClient() as client:
-                # Get relevant data based on query
-                if query_filters:
-                    profiles_response = await client.query_profiles(**query_filters)
-                    stats_response = await client.get_stats()
-                    
-                    if profiles_response.get('success') and stats_response.get('success'):
-                        profiles = profiles_response['data']
-                        stats = stats_response['data']
-                        
-                        # Generate response based on real data
-                        response = self._generate_data_response(user_query, profiles, stats)
-                        return response
+            # Serve near-duplicate queries without touching MCP or the LLM
+            query_embedding = await self._embed_query(user_query)
+            if query_embedding is not None:
+                cached = self.semantic_cache.get(query_embedding)
+                if cached is not None and cached[0] == query_filters:
+                    return cached[1]
+            
+            client = await self._get_mcp_client()
+            
+            # Get relevant data based on query
+            if query_filters:
+                profiles_response, stats_response = await asyncio.gather(
+                    client.query_profiles(**query_filters),
+                    client.get_stats()
+                )
                 
-                # Fallback to general response if no specific data found
-                return self._generate_general_response(user_query)
+                if profiles_response.get('success') and stats_response.get('success'):
+                    profiles = profiles_response['data']
+                    stats = stats_response['data']
+                    
+                    # Generate response based on real data
+                    response = self._generate_data_response(user_query, profiles, stats)
+                    if query_embedding is not None:
+                        self.semantic_cache.put(query_embedding, (query_filters, response))
+                    return response
+            
+            # Fallback to general response if no specific data found
+            return self._generate_general_response(user_query)
                 
         except Exception as e:
             logger.error(f"Error processing query: {e}")
             return self._generate_fallback_response(user_query)
 
-    def _analyze_query_for_filters(self, query: str) -> Dict[str, Any]:
-        """Analyze user query to extract database filters"""
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a query for semantic cache lookup, or None if embedding fails"""
+        try:
+            return await self.embedder.embed(query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed, bypassing semantic cache: {e}")
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _analyze_query_for_filters(query: str) -> Mapping[str, Any]:
+        """Analyze user query to extract database filters.
+        
+        Results are memoized per query string and returned read-only; copy
+        before modifying.
+        """
         filters = {}
-        query_lower = query.lower()
+        
+        # One scan finds every keyword; dict order decides which one wins
+        keywords = set(_FILTER_KEYWORD_RE.findall(query.lower()))
         
         # Geographic filters
-        if 'indian ocean' in query_lower:
-            filters.update({
-                'minLat': -40, 'maxLat': 30,
-                'minLon': 20, 'maxLon': 120
-            })
-        elif 'arabian sea' in query_lower:
-            filters.update({
-                'minLat': 10, 'maxLat': 25,
-                'minLon': 50, 'maxLon': 80
-            })
-        elif 'bay of bengal' in query_lower:
-            filters.update({
-                'minLat': 5, 'maxLat': 25,
-                'minLon': 80, 'maxLon': 100
-            })
+        for region, bounds in _REGION_FILTERS.items():
+            if region in keywords:
+                filters.update(bounds)
+                break
         
         # Temperature filters
-        if 'warm' in query_lower:
-            filters['minTemp'] = 28
-        elif 'cold' in query_lower:
-            filters['maxTemp'] = 15
+        for term, temp_filter in _TEMPERATURE_FILTERS.items():
+            if term in keywords:
+                filters.update(temp_filter)
+                break
         
         # Time filters
-        if '2023' in query:
-            filters.update({
-                'startDate': '2023-01-01',
-                'endDate': '2023-12-31'
-            })
-        elif '2024' in query:
-            filters.update({
-                'startDate': '2024-01-01',
-                'endDate': '2024-12-31'
-            })
+        for year, date_filter in _YEAR_FILTERS.items():
+            if year in keywords:
+                filters.update(date_filter)
+                break
         
         # Limit results for performance
         filters['limit'] = 50
         
-        return filters
+        return MappingProxyType(filters)
 
     def _generate_data_response(self, query: str, profiles: List[Dict], stats: Dict) -> str:
         """Generate response based on real data"""
@@ -180,55 +372,91 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
         # Basic statistics
         profile_count = len(profiles)
         
+        # Gather every field in a single pass over the profiles
+        temps, sals, lats, lons = [], [], [], []
+        first_date = last_date = None
+        qc_count = good_quality = 0
+        for p in profiles:
+            value = p.get('shallow_temp_mean')
+            if value:
+                temps.append(value)
+            value = p.get('shallow_psal_mean')
+            if value:
+                sals.append(value)
+            value = p.get('latitude')
+            if value:
+                lats.append(value)
+            value = p.get('longitude')
+            if value:
+                lons.append(value)
+            value = p.get('DATE')
+            if value:
+                if first_date is None or value < first_date:
+                    first_date = value
+                if last_date is None or value > last_date:
+                    last_date = value
+            value = p.get('profile_temp_qc')
+            if value:
+                qc_count += 1
+                if value == 'A':
+                    good_quality += 1
+        
         # Temperature analysis
-        temps = [p.get('shallow_temp_mean') for p in profiles if p.get('shallow_temp_mean')]
-        avg_temp = sum(temps) / len(temps) if temps else None
+        temp_stats = self._summarize_field(temps)
+        avg_temp = temp_stats[0] if temp_stats else None
         
         # Salinity analysis  
-        sals = [p.get('shallow_psal_mean') for p in profiles if p.get('shallow_psal_mean')]
-        avg_sal = sum(sals) / len(sals) if sals else None
+        sal_stats = self._summarize_field(sals)
+        avg_sal = sal_stats[0] if sal_stats else None
         
         # Geographic distribution
-        lats = [p.get('latitude') for p in profiles if p.get('latitude')]
-        lons = [p.get('longitude') for p in profiles if p.get('longitude')]
+        lat_stats = self._summarize_field(lats)
+        lon_stats = self._summarize_field(lons)
         
-        response = f"🌊 **ARGO Profile Analysis**\n\n"
-        response += f"**Dataset Summary:**\n"
-        response += f"• **Profiles Found**: {profile_count:,}\n"
+        parts = [
+            "🌊 **ARGO Profile Analysis**\n\n",
+            "**Dataset Summary:**\n",
+            f"• **Profiles Found**: {profile_count:,}\n"
+        ]
         
         if avg_temp:
-            response += f"• **Average Surface Temperature**: {avg_temp:.2f}°C\n"
+            parts.append(f"• **Average Surface Temperature**: {avg_temp:.2f}°C\n")
         if avg_sal:
-            response += f"• **Average Surface Salinity**: {avg_sal:.2f} PSU\n"
+            parts.append(f"• **Average Surface Salinity**: {avg_sal:.2f} PSU\n")
         
-        if lats and lons:
-            response += f"• **Geographic Range**: {min(lats):.1f}°N to {max(lats):.1f}°N, {min(lons):.1f}°E to {max(lons):.1f}°E\n"
+        if lat_stats and lon_stats:
+            parts.append(f"• **Geographic Range**: {lat_stats[2]:.1f}°N to {lat_stats[3]:.1f}°N, {lon_stats[2]:.1f}°E to {lon_stats[3]:.1f}°E\n")
         
         # Date range
-        dates = [p.get('DATE') for p in profiles if p.get('DATE')]
-        if dates:
-            response += f"• **Time Range**: {min(dates)} to {max(dates)}\n"
+        if first_date is not None:
+            parts.append(f"• **Time Range**: {first_date} to {last_date}\n")
         
         # Quality assessment
-        qc_flags = [p.get('profile_temp_qc') for p in profiles if p.get('profile_temp_qc')]
-        good_quality = len([q for q in qc_flags if q == 'A'])
-        if qc_flags:
-            response += f"• **Data Quality**: {good_quality}/{len(qc_flags)} profiles with excellent QC\n"
+        if qc_count:
+            parts.append(f"• **Data Quality**: {good_quality}/{qc_count} profiles with excellent QC\n")
         
-        response += f"\n**Key Insights:**\n"
+        parts.append("\n**Key Insights:**\n")
         
         # Query-specific insights
         if 'temperature' in query.lower():
-            if temps:
-                response += f"• Temperature ranges from {min(temps):.1f}°C to {max(temps):.1f}°C\n"
-                response += f"• Standard deviation: {(sum((t - avg_temp)**2 for t in temps) / len(temps))**0.5:.2f}°C\n"
+            if temp_stats:
+                _, temp_std, temp_min, temp_max = temp_stats
+                parts.append(f"• Temperature ranges from {temp_min:.1f}°C to {temp_max:.1f}°C\n")
+                parts.append(f"• Standard deviation: {temp_std:.2f}°C\n")
         
         if 'salinity' in query.lower():
-            if sals:
-                response += f"• Salinity ranges from {min(sals):.2f} to {max(sals):.2f} PSU\n"
-                response += f"• Typical oceanic salinity patterns observed\n"
+            if sal_stats:
+                parts.append(f"• Salinity ranges from {sal_stats[2]:.2f} to {sal_stats[3]:.2f} PSU\n")
+                parts.append("• Typical oceanic salinity patterns observed\n")
         
-        return response
+        return "".join(parts)
+
+    @staticmethod
+    def _summarize_field(values: List[float]):
+        """Return (mean, std, min, max) of collected field values, or None if empty"""
+        if not values:
+            return None
+        return summarize(np.asarray(values, dtype=np.float64))
 
     def _generate_general_response(self, query: str) -> str:
         """Generate general response for queries without specific data"""
@@ -238,21 +466,46 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
         """Generate fallback response when errors occur"""
         return f"🌊 I'm experiencing some technical difficulties accessing the oceanographic database. Please try again in a moment, or rephrase your question about ARGO float data."
 
-    async def _get_llm_response(self) -> str:
-        """Get initial response from LLM"""
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            *self.conversation_history
-        ]
-        
-        response = self.client.chat.completions.create(
+    async def _stream_completion(self, messages: List[Dict[str, str]], max_tokens: int) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive"""
+        stream = await self.client.chat.completions.create(
             model=self.model,
             messages=messages,
             temperature=0.1,
-            max_tokens=1500
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            extra_body={"prompt_cache_key": PROMPT_CACHE_KEY}
         )
         
-        return response.choices[0].message.content
+        async for chunk in stream:
+            if chunk.usage:
+                self._log_prompt_cache_usage(chunk)
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    async def _stream_llm_response(self) -> AsyncIterator[str]:
+        """Stream initial response from LLM"""
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            *self.conversation_history
+        ]
+        
+        async for delta in self._stream_completion(messages, max_tokens=1500):
+            yield delta
+
+    async def _get_llm_response(self) -> str:
+        """Get initial response from LLM"""
+        return "".join([delta async for delta in self._stream_llm_response()])
+
+    @staticmethod
+    def _log_prompt_cache_usage(response):
+        """Log how many prompt tokens the provider served from its cache"""
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        if cached_tokens is not None:
+            logger.debug(f"Prompt cache: {cached_tokens}/{usage.prompt_tokens} prompt tokens cached")
 
     def _contains_tool_calls(self, response: str) -> bool:
         """Check if response contains tool calls"""
@@ -260,21 +513,27 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
 
     async def _execute_tool_calls(self, response: str) -> List[MCPToolResponse]:
         """Extract and execute tool calls from LLM response"""
-        tool_calls = self._extract_tool_calls(response)
-        results = []
+        return await self._simulate_mcp_calls(self._extract_tool_calls(response))
+
+    async def _simulate_mcp_calls(self, tool_calls: List[MCPToolCall]) -> List[MCPToolResponse]:
+        """Run independent tool calls concurrently, in the order given"""
+        # (in real implementation, this would call MCP server)
+        raw_results = await asyncio.gather(
+            *(self._simulate_mcp_call(tool_call) for tool_call in tool_calls),
+            return_exceptions=True
+        )
         
-        for tool_call in tool_calls:
-            try:
-                # Simulate MCP tool execution (in real implementation, this would call MCP server)
-                result = await self._simulate_mcp_call(tool_call)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Tool call failed: {e}")
+        results = []
+        for tool_call, result in zip(tool_calls, raw_results):
+            if isinstance(result, Exception):
+                logger.error(f"Tool call failed: {result}")
                 results.append(MCPToolResponse(
                     call_id=tool_call.call_id,
                     success=False,
-                    error=str(e)
+                    error=str(result)
                 ))
+            else:
+                results.append(result)
         
         return results
 
@@ -282,20 +541,24 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
         """Extract tool calls from LLM response"""
         tool_calls = []
         
-        # Find all TOOL_CALL patterns
-        pattern = r'TOOL_CALL:\s*({[^}]+})'
-        matches = re.findall(pattern, response)
-        
-        for i, match in enumerate(matches):
+        # Decode exactly one JSON object after each TOOL_CALL marker, so
+        # arguments may nest to any depth
+        for i, match in enumerate(_TOOL_CALL_RE.finditer(response)):
             try:
-                call_data = json.loads(match)
+                call_data, _ = _JSON_DECODER.raw_decode(response, match.end())
+                if not isinstance(call_data, dict):
+                    raise ValueError("tool call is not a JSON object")
+                tool_name, arguments = call_data["tool"], call_data["arguments"]
+                if not isinstance(tool_name, str) or not isinstance(arguments, dict):
+                    raise TypeError("tool call needs a string tool and object arguments")
                 tool_calls.append(MCPToolCall(
-                    tool_name=call_data["tool"],
-                    arguments=call_data["arguments"],
+                    tool_name=tool_name,
+                    arguments=arguments,
                     call_id=call_data.get("call_id", f"call_{i}")
                 ))
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse tool call: {e}")
+            except (json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
+                # Skip malformed calls, e.g. a missing "tool" or "arguments" key
+                logger.error(f"Failed to parse tool call: {e!r}")
         
         return tool_calls
 
@@ -320,60 +583,25 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
 
     async def _simulate_query_argo(self, tool_call: MCPToolCall) -> MCPToolResponse:
         """Simulate SQL query execution with Indian Ocean ARGO data"""
-        sample_data = [
-            {
-                "id": 1,
-                "file": "D1901393_001.nc",
-                "date": "2023-06-15T12:00:00Z",
-                "lat": -5.2,
-                "lon": 67.8,
-                "mld": 45.5,
-                "thermoclinedepth": 120.3,
-                "salinitymindepth": 85.2,
-                "salinitymaxdepth": 200.1,
-                "meanstratification": 0.0045,
-                "ohc_0_200m": 2.8e9,
-                "surfacetemp": 28.5,
-                "surfacesal": 35.2,
-                "n_levels": 156,
-                "direction": "ascending"
-            },
-            {
-                "id": 2,
-                "file": "D1901394_002.nc", 
-                "date": "2023-07-20T12:00:00Z",
-                "lat": -8.1,
-                "lon": 72.3,
-                "mld": 32.8,
-                "thermoclinedepth": 95.7,
-                "salinitymindepth": 75.4,
-                "salinitymaxdepth": 180.6,
-                "meanstratification": 0.0052,
-                "ohc_0_200m": 3.1e9,
-                "surfacetemp": 29.2,
-                "surfacesal": 34.8,
-                "n_levels": 142,
-                "direction": "ascending"
-            }
-        ]
+        timestamp = datetime.now().isoformat()
         
         return MCPToolResponse(
             call_id=tool_call.call_id,
             success=True,
             data={
-                "data": sample_data,
+                "data": _SIMULATED_SQL_PROFILES,
                 "metadata": {
-                    "total_count": len(sample_data),
+                    "total_count": len(_SIMULATED_SQL_PROFILES),
                     "page": 1,
                     "page_size": 100,
                     "has_next": False,
-                    "query_time": datetime.now().isoformat(),
+                    "query_time": timestamp,
                     "source": "supabase_postgres",
                     "region": "Indian Ocean"
                 }
             },
             metadata={
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
                 "source": "supabase_postgres",
                 "execution_time": 150,
                 "region": "Indian Ocean"
@@ -382,32 +610,14 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
 
     async def _simulate_retrieve_argo(self, tool_call: MCPToolCall) -> MCPToolResponse:
         """Simulate vector search with Indian Ocean context"""
+        timestamp = datetime.now().isoformat()
         sample_data = {
-            "profiles": [
-                {
-                    "id": 3,
-                    "file": "D1901395_003.nc",
-                    "date": "2023-08-01T12:00:00Z",
-                    "lat": -12.5,
-                    "lon": 78.9,
-                    "mld": 28.3,
-                    "thermoclinedepth": 85.2,
-                    "salinitymindepth": 65.1,
-                    "salinitymaxdepth": 150.8,
-                    "meanstratification": 0.0058,
-                    "ohc_0_200m": 3.4e9,
-                    "surfacetemp": 30.1,
-                    "surfacesal": 34.5,
-                    "n_levels": 138,
-                    "direction": "ascending",
-                    "summary": "SW Monsoon profile with shallow mixed layer, strong thermocline, typical Bay of Bengal characteristics with reduced surface salinity"
-                }
-            ],
+            "profiles": _SIMULATED_SEMANTIC_PROFILES,
             "similarities": [0.92],
             "metadata": {
                 "query": tool_call.arguments.get("query", ""),
                 "total_results": 1,
-                "search_time": datetime.now().isoformat(),
+                "search_time": timestamp,
                 "source": "faiss_vector_search",
                 "region": "Indian Ocean",
                 "seasonal_context": "SW Monsoon period"
@@ -419,7 +629,7 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
             success=True,
             data=sample_data,
             metadata={
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
                 "source": "faiss_vector_search",
                 "execution_time": 85,
                 "region": "Indian Ocean"
@@ -432,13 +642,9 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
         sample_data = {
             "profiles": [
                 {
-                    "id": "argo_loc_001",
-                    "platform_number": "1901396",
+                    **_SIMULATED_LOCATION_PROFILE,
                     "latitude": args["latitude"] + 0.1,
-                    "longitude": args["longitude"] - 0.1,
-                    "date": "2023-03-01T12:00:00Z",
-                    "surface_temp": 20.1,
-                    "surface_sal": 36.5
+                    "longitude": args["longitude"] - 0.1
                 }
             ],
             "location": {
@@ -464,17 +670,7 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
         """Simulate date range search"""
         args = tool_call.arguments
         sample_data = {
-            "profiles": [
-                {
-                    "id": "argo_date_001",
-                    "platform_number": "1901397",
-                    "latitude": 25.5,
-                    "longitude": -80.2,
-                    "date": "2023-06-15T12:00:00Z",
-                    "surface_temp": 28.5,
-                    "surface_sal": 36.8
-                }
-            ],
+            "profiles": _SIMULATED_DATE_RANGE_PROFILES,
             "dateRange": {
                 "startDate": args["startDate"],
                 "endDate": args["endDate"]
@@ -495,29 +691,48 @@ TOOL_CALL: {"tool": "toolName", "arguments": {...}, "call_id": "unique_id"}"""
 
     async def _get_final_response(self, tool_results: List[MCPToolResponse]) -> str:
         """Generate final response using tool results"""
-        # Prepare tool results for LLM
-        results_summary = []
+        return "".join([delta async for delta in self._stream_final_response(tool_results)])
+
+    def _trim_history(self, max_tokens: int):
+        """Drop the oldest history messages until the rest fit in max_tokens"""
+        total = sum(count_tokens(m["content"], self.model) for m in self.conversation_history)
+        while self.conversation_history and total > max_tokens:
+            oldest = self.conversation_history.popleft()
+            total -= count_tokens(oldest["content"], self.model)
+
+    async def _stream_final_response(self, tool_results: List[MCPToolResponse]) -> AsyncIterator[str]:
+        """Stream final response generated from tool results"""
+        self._trim_history(self.max_history_tokens)
+        
+        # Prepare tool results for LLM. Raw MCP response bodies are spliced in
+        # as-is rather than decoded to dicts only to be re-encoded here.
+        results_fragments = []
         for result in tool_results:
-            if result.success:
-                results_summary.append({
+            if result.success and result.raw_json is not None:
+                results_fragments.append(
+                    f'{{"call_id": {json.dumps(result.call_id)}, "success": true, "response": {result.raw_json}}}'
+                )
+            elif result.success:
+                results_fragments.append(_json_dumps_indented({
                     "call_id": result.call_id,
                     "success": True,
                     "data": result.data,
                     "metadata": result.metadata
-                })
+                }))
             else:
-                results_summary.append({
+                results_fragments.append(_json_dumps_indented({
                     "call_id": result.call_id,
                     "success": False,
                     "error": result.error
-                })
+                }))
+        results_summary = "[\n" + ",\n".join(results_fragments) + "\n]"
         
         # Create final prompt with results
         final_prompt = f"""
 Based on the tool execution results below, provide a comprehensive answer to the user's query.
 
 TOOL RESULTS:
-{json.dumps(results_summary, indent=2)}
+{results_summary}
 
 Please:
 1. Synthesize the data into a coherent response
@@ -536,22 +751,18 @@ Provide a natural language response that directly answers the user's question.
             {"role": "user", "content": final_prompt}
         ]
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.1,
-            max_tokens=2000
-        )
+        answer_parts = []
+        async for delta in self._stream_completion(messages, max_tokens=2000):
+            answer_parts.append(delta)
+            yield delta
         
-        final_answer = response.choices[0].message.content
+        final_answer = "".join(answer_parts)
         
         # Add to conversation history
         self.conversation_history.append({
             "role": "assistant",
             "content": final_answer
         })
-        
-        return final_answer
 
 # Example usage and testing
 async def main():
@@ -568,18 +779,19 @@ async def main():
         "Find profiles with unusual thermocline characteristics"
     ]
     
-    for query in test_queries:
-        print(f"\n{'='*60}")
-        print(f"Query: {query}")
-        print(f"{'='*60}")
-        
-        try:
-            response = await agent.process_query(query)
-            print(f"Response: {response}")
-        except Exception as e:
-            print(f"Error: {e}")
-        
-        print("\n" + "-"*60)
+    async with agent:
+        for query in test_queries:
+            print(f"\n{'='*60}")
+            print(f"Query: {query}")
+            print(f"{'='*60}")
+            
+            try:
+                response = await agent.process_query(query)
+                print(f"Response: {response}")
+            except Exception as e:
+                print(f"Error: {e}")
+            
+            print("\n" + "-"*60)
 
 if __name__ == "__main__":
     asyncio.run(main())
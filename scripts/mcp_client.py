@@ -1,111 +1,450 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
+import os
+import random
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 import aiohttp
+import msgspec
+from collections import OrderedDict
 from dataclasses import dataclass
 
+from llm_agent import ARGOLLMAgent, MCPToolCall, MCPToolResponse
+from semantic_cache import BatchEmbedder, SemanticCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
+def _json_loads(body: bytes) -> Any:
+    """Parse a JSON response body, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a JSON request body, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
 @dataclass
 class MCPClientConfig:
     """Configuration for MCP Client"""
     server_url: str = "http://localhost:3000"  # Next.js API endpoint
     timeout: int = 30
     max_retries: int = 3
+    # Connection pool; all traffic goes to server_url, so the per-host limit
+    # is what actually bounds parallel tool calls
+    pool_limit: int = 100
+    pool_limit_per_host: int = 32
+    dns_cache_ttl: int = 300
+    keepalive_timeout: float = 75
+    # Bulkhead: most requests in flight at once from one client
+    max_concurrency: int = 32
+    # Retry backoff (seconds) and circuit breaker
+    backoff_base: float = 0.5
+    backoff_cap: float = 8.0
+    breaker_failure_threshold: int = 5
+    breaker_recovery_timeout: float = 30.0
+    # Seconds an identical GET is served from memory without revalidation
+    response_ttl: float = 30.0
+    response_cache_size: int = 256
+    # Semantic cache for retrieveARGO: reuse results for near-identical queries
+    retrieve_cache_threshold: float = 0.97
+    retrieve_cache_ttl: float = 300.0
+    retrieve_cache_size: int = 256
+
+@dataclass(slots=True)
+class ProfileQuery:
+    """Typed filters for /api/data/profiles; unset (None) fields are omitted"""
+    limit: Optional[int] = None
+    offset: Optional[int] = None
+    minLat: Optional[float] = None
+    maxLat: Optional[float] = None
+    minLon: Optional[float] = None
+    maxLon: Optional[float] = None
+    startDate: Optional[str] = None
+    endDate: Optional[str] = None
+    minTemp: Optional[float] = None
+    maxTemp: Optional[float] = None
+    minSal: Optional[float] = None
+    maxSal: Optional[float] = None
+    
+    def to_params(self) -> Dict[str, str]:
+        """Return the set filters as query string parameters"""
+        params = {}
+        for key in self.__slots__:
+            value = getattr(self, key)
+            if value is not None:
+                params[key] = str(value)
+        return params
+
+class SharedSession:
+    """One aiohttp session for the whole process, shared by every agent.
+    
+    Agents acquire() it when they connect and release() it when they
+    disconnect; the session, and its pool of keep-alive connections, is
+    closed only when the last user releases it. The first acquirer's config
+    sizes the connection pool.
+    """
+    
+    _session: Optional[aiohttp.ClientSession] = None
+    _users = 0
+    
+    @classmethod
+    def acquire(cls, config: "MCPClientConfig") -> aiohttp.ClientSession:
+        if cls._session is None or cls._session.closed:
+            cls._session = MCPClient.create_session(config)
+        cls._users += 1
+        return cls._session
+    
+    @classmethod
+    async def release(cls):
+        cls._users = max(cls._users - 1, 0)
+        if cls._users == 0 and cls._session is not None:
+            await cls._session.close()
+            cls._session = None
+
+# Query parameters accepted by /api/data/profiles
+PROFILE_FILTER_KEYS = ProfileQuery.__slots__
+
+# Statuses worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a server whose circuit breaker is open"""
+
+class CircuitBreaker:
+    """Per-server circuit breaker: CLOSED -> OPEN -> HALF_OPEN -> CLOSED.
+    
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail fast. Once recovery_timeout has elapsed a single trial call is let
+    through (half-open); its outcome closes or re-opens the breaker.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    _registry: Dict[str, "CircuitBreaker"] = {}
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+    
+    @classmethod
+    def for_server(cls, server_url: str, **kwargs) -> "CircuitBreaker":
+        """Return the breaker shared by all clients of a server"""
+        if server_url not in cls._registry:
+            cls._registry[server_url] = cls(**kwargs)
+        return cls._registry[server_url]
+    
+    def before_call(self):
+        """Fail fast while open; allow a single trial call once recovery is due"""
+        if self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+            return
+        raise CircuitOpenError("Circuit breaker open for MCP server")
+    
+    def record_success(self):
+        self.state = self.CLOSED
+        self._failures = 0
+    
+    def record_failure(self):
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+    
+    def release_trial(self):
+        """Give back a half-open trial that ended without an outcome.
+        
+        The recovery timeout has already elapsed, so the next call becomes
+        the new trial instead of the breaker staying half-open for good.
+        """
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
 
 class MCPClient:
     """Client for communicating with MCP Server"""
     
-    def __init__(self, config: MCPClientConfig = None):
+    def __init__(self, config: MCPClientConfig = None, session: Optional[aiohttp.ClientSession] = None,
+                 embedder: Optional[BatchEmbedder] = None):
+        """Create a client, optionally on a session owned by the caller.
+        
+        An injected session is reused as-is and never closed by the client, so
+        one session (and its connection pool) can outlive many clients. With an
+        embedder, retrieveARGO results are cached by query similarity.
+        """
         self.config = config or MCPClientConfig()
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        # Held only while a request is in flight, never across retry backoff
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        # (path, params) -> (ETag, body), revalidated with If-None-Match
+        self._etag_cache: Dict[tuple, Tuple[str, bytes]] = {}
+        # (path, params) -> (body, fetched_at), LRU-ordered, served without a request
+        self._response_cache: "OrderedDict[tuple, Tuple[bytes, float]]" = OrderedDict()
+        self._embedder = embedder
+        # limit -> semantic cache of retrieveARGO bodies fetched with that limit
+        self._retrieve_caches: Dict[Any, SemanticCache] = {}
+        self._breaker = CircuitBreaker.for_server(
+            self.config.server_url,
+            failure_threshold=self.config.breaker_failure_threshold,
+            recovery_timeout=self.config.breaker_recovery_timeout
+        )
+    
+    @staticmethod
+    def create_session(config: MCPClientConfig) -> aiohttp.ClientSession:
+        """Create an HTTP session configured for the MCP server"""
+        connector = aiohttp.TCPConnector(
+            limit=config.pool_limit,
+            limit_per_host=config.pool_limit_per_host,
+            ttl_dns_cache=config.dns_cache_ttl,
+            keepalive_timeout=config.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=config.timeout)
+        )
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
-        )
+        if self.session is None:
+            self.session = self.create_session(self.config)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
+            self.session = None
+    
+    async def _request(self, method: str, path: str, cache_key: Optional[tuple] = None, **kwargs) -> bytes:
+        """Send a request to the server, returning the raw response body.
+        
+        Rate-limit (429), 5xx, network and timeout failures are retried with
+        full-jitter exponential backoff and counted by the server's circuit
+        breaker; other 4xx responses fail immediately. When cache_key is given
+        the request is made conditional on the last ETag seen for that key.
+        """
+        url = f"{self.config.server_url}{path}"
+        cached = self._etag_cache.get(cache_key) if cache_key is not None else None
+        if cached:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "If-None-Match": cached[0]}
+        
+        for attempt in range(self.config.max_retries):
+            self._breaker.before_call()
+            try:
+                async with self._semaphore, self.session.request(method, url, **kwargs) as response:
+                    if response.status == 304 and cached:
+                        self._breaker.record_success()
+                        return cached[1]
+                    
+                    if response.status == 200:
+                        body = await response.read()
+                        self._breaker.record_success()
+                        etag = response.headers.get("ETag")
+                        if cache_key is not None and etag:
+                            self._etag_cache[cache_key] = (etag, body)
+                        return body
+                    
+                    error_text = await response.text()
+                    if response.status not in RETRYABLE_STATUSES:
+                        # The server answered; the request itself was bad
+                        self._breaker.record_success()
+                        raise Exception(f"{method} {path} failed: {response.status} - {error_text}")
+                    
+                    logger.error(f"{method} {path} failed with status {response.status}: {error_text}")
+                    failure = f"{response.status} - {error_text}"
+                    
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Network error on attempt {attempt + 1}: {e}")
+                failure = f"Network error: {e}"
+            except BaseException:
+                # Cancelled, or failed without telling us anything about the server
+                self._breaker.release_trial()
+                raise
+            
+            self._breaker.record_failure()
+            if attempt == self.config.max_retries - 1:
+                raise Exception(f"{method} {path} failed after {attempt + 1} attempts: {failure}")
+            
+            # Full jitter: spread retries so clients don't stampede a recovering server
+            backoff = min(self.config.backoff_cap, self.config.backoff_base * 2 ** attempt)
+            await asyncio.sleep(random.uniform(0, backoff))
+        
+        raise Exception("Max retries exceeded")
+    
+    async def _cached_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> bytes:
+        """GET a slowly-changing resource, reusing identical recent responses.
+        
+        Responses younger than response_ttl are returned without a request;
+        older ones are revalidated with their ETag, so an unchanged resource
+        costs a bodiless 304 rather than a full transfer.
+        """
+        key = (path, frozenset(params.items()) if params else None)
+        now = time.monotonic()
+        
+        cached = self._response_cache.get(key)
+        if cached and now - cached[1] < self.config.response_ttl:
+            self._response_cache.move_to_end(key)
+            return cached[0]
+        
+        body = await self._request("GET", path, cache_key=key, params=params)
+        
+        self._response_cache[key] = (body, time.monotonic())
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self.config.response_cache_size:
+            evicted, _ = self._response_cache.popitem(last=False)
+            self._etag_cache.pop(evicted, None)
+        return body
     
-    async def query_profiles(self, **filters) -> Dict[str, Any]:
-        """Query ARGO profiles using the API endpoint"""
+    async def query_profiles(self, q: Optional[ProfileQuery] = None, **filters) -> Dict[str, Any]:
+        """Query ARGO profiles using the API endpoint.
+        
+        Filters may be given as a ProfileQuery or as keyword arguments.
+        """
+        return _json_loads(await self._query_profiles_raw(q, **filters))
+    
+    async def _query_profiles_raw(self, q: Optional[ProfileQuery] = None, **filters) -> bytes:
+        """Query ARGO profiles, returning the undecoded JSON response body"""
         if not self.session:
             raise RuntimeError("MCPClient must be used as async context manager")
         
-        # Build query parameters
-        params = {}
-        if 'limit' in filters:
-            params['limit'] = filters['limit']
-        if 'offset' in filters:
-            params['offset'] = filters['offset']
-        if 'minLat' in filters:
-            params['minLat'] = filters['minLat']
-        if 'maxLat' in filters:
-            params['maxLat'] = filters['maxLat']
-        if 'minLon' in filters:
-            params['minLon'] = filters['minLon']
-        if 'maxLon' in filters:
-            params['maxLon'] = filters['maxLon']
-        if 'startDate' in filters:
-            params['startDate'] = filters['startDate']
-        if 'endDate' in filters:
-            params['endDate'] = filters['endDate']
-        if 'minTemp' in filters:
-            params['minTemp'] = filters['minTemp']
-        if 'maxTemp' in filters:
-            params['maxTemp'] = filters['maxTemp']
-        if 'minSal' in filters:
-            params['minSal'] = filters['minSal']
-        if 'maxSal' in filters:
-            params['maxSal'] = filters['maxSal']
+        if q is not None:
+            params = q.to_params()
+        else:
+            params = {key: filters[key] for key in PROFILE_FILTER_KEYS if key in filters}
         
         try:
-            url = f"{self.config.server_url}/api/data/profiles"
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"API request failed: {response.status} - {error_text}")
+            return await self._cached_get("/api/data/profiles", params)
         except Exception as e:
             logger.error(f"Error querying profiles: {e}")
             raise
     
+    async def iter_profiles(self, q: Optional[ProfileQuery] = None, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ARGO profiles one at a time as the response streams in.
+        
+        With ijson installed, rows are parsed incrementally from the socket, so
+        a large result set is never held in memory twice and callers can start
+        on the first rows early; otherwise the body is read and parsed whole.
+        Streamed responses bypass the response cache and are not retried.
+        """
+        if not self.session:
+            raise RuntimeError("MCPClient must be used as async context manager")
+        
+        params = q.to_params() if q is not None else {
+            key: filters[key] for key in PROFILE_FILTER_KEYS if key in filters
+        }
+        url = f"{self.config.server_url}/api/data/profiles"
+        
+        self._breaker.before_call()
+        try:
+            async with self._semaphore, self.session.get(url, params=params) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    if response.status in RETRYABLE_STATUSES:
+                        self._breaker.record_failure()
+                    else:
+                        # The server answered; the request itself was bad
+                        self._breaker.record_success()
+                    raise Exception(f"Profile stream failed: {response.status} - {error_text}")
+                self._breaker.record_success()
+                
+                if ijson is not None:
+                    async for profile in ijson.items(response.content, "data.item", use_float=True):
+                        yield profile
+                else:
+                    for profile in _json_loads(await response.read()).get("data", []):
+                        yield profile
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, abandoned by the caller, or failed without a server verdict
+            self._breaker.release_trial()
+            raise
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
+        return _json_loads(await self._get_stats_raw())
+    
+    async def _get_stats_raw(self) -> bytes:
+        """Get database statistics, returning the undecoded JSON response body"""
         if not self.session:
             raise RuntimeError("MCPClient must be used as async context manager")
         
         try:
-            url = f"{self.config.server_url}/api/data/stats"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Stats request failed: {response.status} - {error_text}")
+            return await self._cached_get("/api/data/stats")
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             raise
 
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call an MCP tool with the given arguments"""
+        return _json_loads(await self.call_tool_raw(tool_name, arguments))
+    
+    async def call_tool_raw(self, tool_name: str, arguments: Dict[str, Any]) -> bytes:
+        """Call an MCP tool, returning the undecoded JSON response body.
+        
+        Callers can decode the bytes straight into a typed MCPToolResult and
+        embed them in LLM prompts without re-serializing.
+        """
         if not self.session:
             raise RuntimeError("MCPClient must be used as async context manager")
         
         # Route to appropriate API endpoint based on tool name
         if tool_name == "queryARGO":
-            return await self.query_profiles(**arguments)
+            return await self._query_profiles_raw(**arguments)
         elif tool_name == "getStats":
-            return await self.get_stats()
+            return await self._get_stats_raw()
+        elif tool_name == "retrieveARGO" and self._embedder is not None:
+            return await self._retrieve_argo_raw(arguments)
+        
+        return await self._post_tool_call(tool_name, arguments)
+    
+    async def _retrieve_argo_raw(self, arguments: Dict[str, Any]) -> bytes:
+        """Run retrieveARGO, reusing the result of a near-identical recent query"""
+        try:
+            embedding = await self._embedder.embed(arguments.get("query", ""))
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping retrieve cache: {e}")
+            return await self._post_tool_call("retrieveARGO", arguments)
+        
+        limit = arguments.get("limit")
+        cache = self._retrieve_caches.get(limit)
+        if cache is None:
+            cache = self._retrieve_caches[limit] = SemanticCache(
+                threshold=self.config.retrieve_cache_threshold,
+                ttl=self.config.retrieve_cache_ttl,
+                max_size=self.config.retrieve_cache_size
+            )
         
-        # Fallback to MCP server if available
+        body = cache.get(embedding)
+        if body is None:
+            body = await self._post_tool_call("retrieveARGO", arguments)
+            cache.put(embedding, body)
+        return body
+    
+    async def _post_tool_call(self, tool_name: str, arguments: Dict[str, Any]) -> bytes:
+        """Call a tool on the MCP server endpoint"""
         payload = {
             "method": "tools/call",
             "params": {
@@ -114,33 +453,12 @@ class MCPClient:
             }
         }
         
-        for attempt in range(self.config.max_retries):
-            try:
-                async with self.session.post(
-                    f"{self.config.server_url}/mcp",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    
-                    if response.status == 200:
-                        result = await response.json()
-                        return result
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"MCP call failed with status {response.status}: {error_text}")
-                        
-                        if attempt == self.config.max_retries - 1:
-                            raise Exception(f"MCP call failed: {error_text}")
-                        
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error on attempt {attempt + 1}: {e}")
-                if attempt == self.config.max_retries - 1:
-                    raise Exception(f"Network error: {e}")
-                
-                # Wait before retry
-                await asyncio.sleep(2 ** attempt)
-        
-        raise Exception("Max retries exceeded")
+        return await self._request(
+            "POST",
+            "/mcp",
+            data=_json_dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
     
     async def query_argo(self, sql: str, page: int = 1, page_size: int = 100) -> Dict[str, Any]:
         """Execute SQL query on ARGO data"""
@@ -174,48 +492,90 @@ class MCPClient:
             "pageSize": page_size
         })
 
+class MCPToolResult(msgspec.Struct):
+    """Wire format of an MCP tool response body"""
+    success: bool = True
+    data: Any = None
+    # Servers may send a non-string error or "metadata": null; both are passed through
+    error: Optional[Any] = None
+    metadata: Optional[Dict[str, Any]] = {}
+
+_TOOL_RESULT_DECODER = msgspec.json.Decoder(MCPToolResult)
+
+def _decode_tool_result(raw_json: bytes) -> MCPToolResult:
+    """Decode a tool response body, falling back to lenient parsing of odd field types"""
+    try:
+        return _TOOL_RESULT_DECODER.decode(raw_json)
+    except msgspec.ValidationError:
+        result = _json_loads(raw_json)
+        return MCPToolResult(
+            success=result.get("success", True),
+            data=result.get("data"),
+            error=result.get("error"),
+            metadata=result.get("metadata", {})
+        )
+
 # Integration with LLM Agent
 class ProductionARGOLLMAgent(ARGOLLMAgent):
     """Production version of ARGO LLM Agent that uses real MCP Client"""
     
+    SUPPORTED_TOOLS = ("queryARGO", "retrieveARGO", "getARGOByLocation", "getARGOByDateRange")
+    
+    # Argument defaults of the matching MCPClient wrappers (query_argo, retrieve_argo, ...)
+    TOOL_DEFAULTS = {
+        "queryARGO": {"page": 1, "pageSize": 100},
+        "retrieveARGO": {"limit": 10},
+        "getARGOByLocation": {"radius": 100},
+        "getARGOByDateRange": {"page": 1, "pageSize": 100},
+    }
+    
     def __init__(self, openai_api_key: str, mcp_config: MCPClientConfig = None, model: str = "gpt-4"):
         super().__init__(openai_api_key, model)
         self.mcp_config = mcp_config or MCPClientConfig()
     
+    async def _simulate_mcp_calls(self, tool_calls: List[MCPToolCall]) -> List[MCPToolResponse]:
+        """Fan tool calls out concurrently over the shared connection pool.
+        
+        Connecting up front means every call sees the same client, whose
+        bulkhead bounds how many of them are in flight at once.
+        """
+        await self._get_mcp_client()
+        return await super()._simulate_mcp_calls(tool_calls)
+    
     async def _simulate_mcp_call(self, tool_call: MCPToolCall) -> MCPToolResponse:
         """Replace simulation with actual MCP client calls"""
-        async with MCPClient(self.mcp_config) as client:
-            try:
-                if tool_call.tool_name == "queryARGO":
-                    result = await client.query_argo(**tool_call.arguments)
-                elif tool_call.tool_name == "retrieveARGO":
-                    result = await client.retrieve_argo(**tool_call.arguments)
-                elif tool_call.tool_name == "getARGOByLocation":
-                    result = await client.get_argo_by_location(**tool_call.arguments)
-                elif tool_call.tool_name == "getARGOByDateRange":
-                    result = await client.get_argo_by_date_range(**tool_call.arguments)
-                else:
-                    return MCPToolResponse(
-                        call_id=tool_call.call_id,
-                        success=False,
-                        error=f"Unknown tool: {tool_call.tool_name}"
-                    )
-                
-                return MCPToolResponse(
-                    call_id=tool_call.call_id,
-                    success=result.get("success", True),
-                    data=result.get("data"),
-                    error=result.get("error"),
-                    metadata=result.get("metadata", {})
-                )
-                
-            except Exception as e:
-                logger.error(f"MCP call failed: {e}")
+        try:
+            if tool_call.tool_name not in self.SUPPORTED_TOOLS:
                 return MCPToolResponse(
                     call_id=tool_call.call_id,
                     success=False,
-                    error=str(e)
+                    error=f"Unknown tool: {tool_call.tool_name}"
                 )
+            
+            # Shared client: every tool call reuses one session and its pool
+            client = await self._get_mcp_client()
+            
+            # Tool arguments from the LLM already use the MCP parameter names
+            arguments = {**self.TOOL_DEFAULTS[tool_call.tool_name], **tool_call.arguments}
+            raw_json = await client.call_tool_raw(tool_call.tool_name, arguments)
+            result = _decode_tool_result(raw_json)
+            
+            return MCPToolResponse(
+                call_id=tool_call.call_id,
+                success=result.success,
+                data=result.data,
+                error=result.error,
+                metadata=result.metadata,
+                raw_json=raw_json.decode()
+            )
+            
+        except Exception as e:
+            logger.error(f"MCP call failed: {e}")
+            return MCPToolResponse(
+                call_id=tool_call.call_id,
+                success=False,
+                error=str(e)
+            )
 
 # Example usage with real MCP client
 async def production_example():
@@ -230,14 +590,15 @@ async def production_example():
     
     # Initialize production agent
     agent = ProductionARGOLLMAgent(
-        openai_api_key=OS.getenv("OPENROUTER_API_KEY"),
+        openai_api_key=os.getenv("OPENROUTER_API_KEY"),
         mcp_config=mcp_config
     )
     
-    # Process query
-    response = await agent.process_query(
-        "Find warm water ARGO profiles in the tropical Pacific Ocean from 2023"
-    )
+    # One HTTP session for the agent's lifetime, closed on exit
+    async with agent:
+        response = await agent.process_query(
+            "Find warm water ARGO profiles in the tropical Pacific Ocean from 2023"
+        )
     
     print(response)
 
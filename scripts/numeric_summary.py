@@ -0,0 +1,50 @@
+"""
+Single-pass numeric summaries for ARGO profile fields.
+
+summarize() computes mean, standard deviation, min and max in one fused loop
+using Welford's online algorithm. The loop is JIT-compiled with Numba when it
+is installed; otherwise NumPy reductions are used. Numba is imported on first
+use, since importing it costs hundreds of milliseconds at startup.
+"""
+
+import math
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+Summary = Tuple[float, float, float, float]
+
+_summarize_impl: Optional[Callable[[np.ndarray], Summary]] = None
+
+def _welford_summary(values: np.ndarray) -> Summary:
+    """Return (mean, population std, min, max) of a non-empty float64 array"""
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    lo = math.inf
+    hi = -math.inf
+    for x in values:
+        count += 1
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+        if x < lo:
+            lo = x
+        if x > hi:
+            hi = x
+    return mean, math.sqrt(m2 / count), lo, hi
+
+def _numpy_summary(values: np.ndarray) -> Summary:
+    """NumPy fallback for summarize() when Numba is unavailable"""
+    return float(values.mean()), float(values.std()), float(values.min()), float(values.max())
+
+def summarize(values: np.ndarray) -> Summary:
+    """Return (mean, population std, min, max) of a non-empty float64 array"""
+    global _summarize_impl
+    if _summarize_impl is None:
+        try:
+            from numba import njit
+            _summarize_impl = njit(cache=True)(_welford_summary)
+        except ImportError:
+            _summarize_impl = _numpy_summary
+    return _summarize_impl(values)
@@ -6,12 +6,13 @@ import os
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RAGConfig:
     """RAG Pipeline configuration"""
     
     # OpenAI Configuration
-    openai_api_key: str = os.getenv("OPENROUTER_API_KEY", "")
+    # Read from OPENROUTER_API_KEY by from_env(), not at import time
+    openai_api_key: str = ""
     openai_model: str = "gpt-4"
     embedding_model: str = "text-embedding-3-small"
     
@@ -36,7 +37,7 @@ class RAGConfig:
     def from_env(cls) -> "RAGConfig":
         """Create configuration from environment variables"""
         return cls(
-            openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+            openai_api_key=os.getenv("OPENROUTER_API_KEY", ""),
             openai_model=os.getenv("OPENAI_MODEL", "gpt-4"),
             embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
             mcp_server_path=os.getenv("MCP_SERVER_PATH", "node server/mcp/index.js"),
@@ -12,29 +12,192 @@ A comprehensive backend RAG system that:
 """
 
 import json
+import time
 import asyncio
 import logging
+import weakref
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
-from dataclasses import dataclass, asdict
+from typing import AsyncIterator, Dict, List, Any, Optional, Union
 from enum import Enum
+from collections import OrderedDict
+from collections.abc import Sequence
 import re
 
 # MCP and AI SDK imports
 try:
     from mcp import ClientSession, StdioServerParameters
     from mcp.client.stdio import stdio_client
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     import numpy as np
 except ImportError as e:
     print(f"Missing required dependencies: {e}")
     print("Install with: pip install mcp openai numpy")
     exit(1)
 
+from semantic_cache import BatchEmbedder, SemanticCache
+from token_count import count_tokens
+
+import msgspec
+from msgspec.structs import replace
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Entity extraction patterns
+_NUM_RE = re.compile(r'-?\d+\.?\d*')
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_OCEAN_TERMS = ('temperature', 'salinity', 'pressure', 'depth',
+                'latitude', 'longitude', 'pacific', 'atlantic', 'indian')
+_OCEAN_TERM_RE = re.compile('|'.join(_OCEAN_TERMS))
+
+def _json_loads(text: Union[str, bytes]) -> Any:
+    """Parse JSON, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _tool_result_data(result) -> Dict[str, Any]:
+    """Decode an MCP tool result's JSON text content once, into a dict"""
+    if not result.content:
+        return {}
+    text = result.content[0].text
+    if not isinstance(text, (str, bytes)):
+        return text
+    try:
+        return _json_loads(text)
+    except ValueError as e:
+        # e.g. a plain-text error from the server; treat it as no results
+        logger.warning(f"MCP tool returned non-JSON content: {e}")
+        return {}
+
+def _json_default(obj: Any) -> Any:
+    """Serialize lazy containers such as LazyProfiles as plain lists"""
+    if isinstance(obj, LazyProfiles):
+        return obj.to_list()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+_JSON_ENCODER = msgspec.json.Encoder(enc_hook=_json_default)
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize compact JSON with msgspec"""
+    return _JSON_ENCODER.encode(obj).decode()
+
+# Answer-generation prompt, filled in by RAGPipeline._response_messages
+_RESPONSE_SYSTEM_PROMPT = """You are an expert oceanographer providing insights on ARGO profile data.
+Generate a comprehensive, natural language response that:
+1. Directly answers the user's query
+2. Summarizes key findings from the data
+3. Provides oceanographic context and interpretation
+4. Mentions data quality and limitations if relevant
+5. Uses scientific terminology appropriately
+
+Be concise but informative. Focus on the most relevant insights."""
+
+_RESPONSE_USER_TEMPLATE = """User Query: "{query}"
+
+Intent: {intent}
+Profiles found: {total}
+Latitude range: {lat_range}
+Longitude range: {lon_range}
+Surface temperature (°C): {temperature}
+Surface salinity (PSU): {salinity}
+
+Sample Profiles:
+{samples}
+
+Please provide a comprehensive response to the user's query based on this ARGO data."""
+
+# Prompt tokens allowed for answer generation, and the sample profile fields
+# dropped (in order) to get under it
+RESPONSE_PROMPT_TOKEN_BUDGET = 2000
+_SAMPLE_FIELD_DROP_ORDER = ('metadata', 'rag_context', 'similarity_score', 'variables')
+
+def _format_bounds(bounds: List[float]) -> str:
+    return f"{bounds[0]:.2f} to {bounds[1]:.2f}"
+
+def _format_variable_range(stats: Dict[str, Optional[float]]) -> str:
+    if stats["mean"] is None:
+        return "no data"
+    return f"min {stats['min']:.2f}, max {stats['max']:.2f}, mean {stats['mean']:.2f}"
+
+# Chat completions in flight at once across all pipelines on an event loop;
+# transient failures are retried with backoff by the SDK itself
+MAX_CONCURRENT_COMPLETIONS = 32
+OPENAI_MAX_RETRIES = 4
+# A semaphore binds to the loop it is first contended on, so each loop
+# (e.g. each asyncio.run) gets its own
+_completion_slots_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def _completion_slots() -> asyncio.Semaphore:
+    """The chat completion semaphore for the running event loop"""
+    loop = asyncio.get_running_loop()
+    slots = _completion_slots_by_loop.get(loop)
+    if slots is None:
+        slots = _completion_slots_by_loop[loop] = asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS)
+    return slots
+
+async def _chat_completion(client: AsyncOpenAI, **kwargs):
+    """Create a chat completion, bounded by the shared concurrency limit"""
+    async with _completion_slots():
+        return await client.chat.completions.create(**kwargs)
+
+# Keyword gazetteer adding intent evidence beyond the regex patterns; both
+# term lists are scanned in a single pass and each distinct term counts once
+_SQL_TERMS = (
+    'between', 'greater than', 'less than', 'more than', 'fewer than', 'at least',
+    'at most', 'above', 'below', 'exceeding', 'equal to', 'how many', 'number of',
+    'count', 'average', 'mean', 'median', 'total', 'sum', 'maximum', 'minimum',
+    'highest', 'lowest', 'top', 'list', 'sort', 'sorted', 'per', 'before', 'after',
+    'since', 'until', 'platform', 'float id', 'cycle number', 'data mode', 'quality flag',
+)
+_SEMANTIC_TERMS = (
+    'characteristics', 'similar', 'like', 'resembling', 'near', 'around', 'pattern',
+    'patterns', 'describe', 'explain', 'what are', 'tell me', 'overview', 'trend',
+    'trends', 'typical', 'unusual', 'conditions', 'behaviour', 'behavior', 'anomaly',
+    'anomalies', 'eddy', 'eddies', 'el nino', 'la nina', 'monsoon', 'water mass',
+    'mixing', 'variability', 'climate', 'region', 'regions', 'insights',
+)
+_GAZETTEER_RE = re.compile(
+    r'(?P<sql>\b(?:' + '|'.join(map(re.escape, _SQL_TERMS)) + r')\b|[<>]=?|\d{4}-\d{2}-\d{2}|\b(?:19|20)\d{2}\b)'
+    r'|(?P<semantic>\b(?:' + '|'.join(map(re.escape, _SEMANTIC_TERMS)) + r')\b)'
+)
+
+def _gazetteer_scores(q: str) -> tuple[int, int]:
+    """Count distinct SQL and semantic gazetteer terms in a lowercased query"""
+    hits = {(match.lastgroup, match.group()) for match in _GAZETTEER_RE.finditer(q)}
+    sql_hits = sum(1 for group, _ in hits if group == 'sql')
+    return sql_hits, len(hits) - sql_hits
+
+# Words that don't change the SQL a query maps to, dropped before cache lookup
+_STOPWORD_RE = re.compile(
+    r'\b(?:a|an|the|me|my|please|show|give|get|find|list|all|any|some|of|for|'
+    r'in|on|at|from|to|with|that|which|are|is|there|can|you|i|want|need)\b'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _normalize_query(query: str) -> str:
+    """Lowercase, drop stopwords and collapse whitespace"""
+    return _WHITESPACE_RE.sub(' ', _STOPWORD_RE.sub(' ', query.lower())).strip()
+
+def _query_key(query: str) -> str:
+    """Key for queries that differ only in case or whitespace"""
+    return _WHITESPACE_RE.sub(' ', query.strip().lower())
+
+def _entities_key(entities: Dict[str, Any]) -> tuple:
+    """Hashable form of extracted entities"""
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in entities.items()))
+
 class QueryIntent(Enum):
     """Query intent classification"""
     SQL_QUERY = "sql"
@@ -42,8 +205,7 @@ class QueryIntent(Enum):
     HYBRID = "hybrid"
     UNKNOWN = "unknown"
 
-@dataclass
-class QueryContext:
+class QueryContext(msgspec.Struct):
     """Context information for query processing"""
     original_query: str
     intent: QueryIntent
@@ -51,9 +213,9 @@ class QueryContext:
     extracted_entities: Dict[str, Any]
     sql_query: Optional[str] = None
     semantic_query: Optional[str] = None
+    query_embedding: Optional[List[float]] = None
 
-@dataclass
-class ARGOResult:
+class ARGOResult(msgspec.Struct, gc=False):
     """Structured ARGO profile result"""
     id: str
     float_id: str
@@ -64,9 +226,16 @@ class ARGOResult:
     metadata: Dict[str, Any]
     similarity_score: Optional[float] = None
     rag_context: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict of this result.
+        
+        The nested dicts are shared, not deep-copied, so results should be
+        updated with msgspec.structs.replace() rather than mutated in place.
+        """
+        return msgspec.structs.asdict(self)
 
-@dataclass
-class RAGResponse:
+class RAGResponse(msgspec.Struct):
     """Final RAG pipeline response"""
     query: str
     intent: QueryIntent
@@ -75,86 +244,181 @@ class RAGResponse:
     natural_language_response: str
     metadata: Dict[str, Any]
 
+_INTENT_BY_LABEL = {
+    'sql': QueryIntent.SQL_QUERY,
+    'semantic': QueryIntent.SEMANTIC_SEARCH,
+    'hybrid': QueryIntent.HYBRID
+}
+
+# Labeled seed queries for the embedding router in IntentClassifier
+_ROUTER_EXAMPLES = {
+    "sql": [
+        "Show profiles with temperature > 25",
+        "Count floats where salinity < 34",
+        "List profiles between latitude -10 and 10",
+        "Select profiles with date between '2023-01-01' and '2023-12-31'",
+        "Average surface temperature by month for 2024",
+        "Maximum pressure recorded per float",
+        "How many cycles did float 2902746 complete",
+        "Profiles with thermocline depth greater than 150 meters",
+    ],
+    "semantic": [
+        "Find warm water profiles in the Pacific Ocean",
+        "What are the temperature characteristics of tropical waters?",
+        "Show me profiles similar to upwelling conditions",
+        "Describe cold polar ocean observations",
+        "Search for profiles near ocean fronts and gyres",
+        "Find deep water measurements with high salinity",
+        "Tell me about seasonal changes in the Arabian Sea",
+        "Profiles that look like an El Nino event",
+    ],
+    "hybrid": [
+        "Find warm tropical profiles with temperature > 28 in 2023",
+        "Show upwelling regions where salinity < 35",
+        "Cold water profiles between latitude 50 and 70 similar to Arctic conditions",
+        "Seasonal salinity trends for floats with more than 100 cycles",
+        "Equatorial Pacific profiles from 2024 with high stratification",
+        "Deep profiles below 1500 m in the Southern Ocean gyre",
+    ],
+}
+
 class IntentClassifier:
     """Classifies user queries into SQL or semantic search intents"""
     
-    def __init__(self, openai_client: OpenAI):
+    # Router neighbours voting on each query, and the vote share below which
+    # the GPT-4 classifier is consulted instead
+    ROUTER_K = 5
+    ROUTER_MIN_CONFIDENCE = 0.6
+    
+    def __init__(self, openai_client: AsyncOpenAI, embedder: Optional[BatchEmbedder] = None):
         self.openai = openai_client
+        self.embedder = embedder
+        # (unit-norm seed embeddings, seed labels), built on first use
+        self._router: Optional[tuple] = None
         
         # SQL intent patterns
-        self.sql_patterns = [
+        self.sql_patterns = [re.compile(p, re.IGNORECASE) for p in [
             r'\b(select|where|group by|order by|count|sum|avg|max|min)\b',
             r'\b(temperature|salinity|pressure|depth)\s*(>|<|=|>=|<=)\s*\d+',
             r'\b(latitude|longitude)\s*(between|>|<|=)\s*[-\d.]+',
             r'\bdate\s*(between|>|<|=)\s*[\'\"]\d{4}-\d{2}-\d{2}',
             r'\b(profiles?|floats?|cycles?)\s*(with|having|where)',
-        ]
+        ]]
         
         # Semantic search patterns
-        self.semantic_patterns = [
+        self.semantic_patterns = [re.compile(p, re.IGNORECASE) for p in [
             r'\b(find|search|show|get|retrieve)\s+.*\b(like|similar|related)',
             r'\b(warm|cold|hot|cool)\s+(water|ocean|sea)',
             r'\b(high|low|deep|shallow)\s+(salinity|temperature|pressure)',
             r'\b(tropical|arctic|polar|equatorial|subtropical)',
             r'\b(upwelling|downwelling|current|gyre|front)',
             r'\b(seasonal|winter|summer|spring|fall|autumn)',
-        ]
+        ]]
+        
+        # All intent patterns in one Hyperscan database, scanned in a single pass
+        self._pattern_db = self._compile_pattern_db() if hyperscan is not None else None
 
-    async def classify_intent(self, query: str) -> QueryContext:
-        """Classify query intent using pattern matching and LLM"""
+    async def classify_intent(self, query: str, query_embedding: Optional[List[float]] = None) -> QueryContext:
+        """Classify query intent using pattern matching, then the embedding router or LLM"""
         
-        # Pattern-based classification
-        sql_score = sum(1 for pattern in self.sql_patterns 
-                       if re.search(pattern, query.lower()))
-        semantic_score = sum(1 for pattern in self.semantic_patterns 
-                           if re.search(pattern, query.lower()))
+        # Pattern-based classification, plus gazetteer keyword evidence
+        q = query.lower()
+        sql_terms, semantic_terms = _gazetteer_scores(q)
+        sql_hits, semantic_hits = self._pattern_scores(q)
+        sql_score = sql_terms + sql_hits
+        semantic_score = semantic_terms + semantic_hits
         
-        # Extract entities
         entities = await self._extract_entities(query)
         
-        # LLM-based classification for ambiguous cases
-        if abs(sql_score - semantic_score) <= 1:
-            intent, confidence = await self._llm_classify(query)
+        # Only queries with no signal at all need the router / LLM
+        if sql_score == 0 and semantic_score == 0 and not entities.get('ocean_terms'):
+            intent, confidence = await self._llm_classify(query, query_embedding)
         else:
             if sql_score > semantic_score:
-                intent, confidence = QueryIntent.SQL_QUERY, 0.8
+                intent = QueryIntent.SQL_QUERY
+            elif semantic_score > sql_score:
+                intent = QueryIntent.SEMANTIC_SEARCH
+            elif sql_score > 0:
+                intent = QueryIntent.HYBRID
             else:
-                intent, confidence = QueryIntent.SEMANTIC_SEARCH, 0.8
+                # Only ocean terms matched: the pipeline's default strategy
+                intent = QueryIntent.SEMANTIC_SEARCH
+            confidence = 0.6 + 0.1 * min(abs(sql_score - semantic_score), 3)
         
         return QueryContext(
             original_query=query,
             intent=intent,
             confidence=confidence,
-            extracted_entities=entities
+            extracted_entities=entities,
+            query_embedding=query_embedding
         )
 
+    def _compile_pattern_db(self):
+        """Compile sql_patterns + semantic_patterns into a Hyperscan database, or None on failure"""
+        patterns = self.sql_patterns + self.semantic_patterns
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[p.pattern.encode() for p in patterns],
+                ids=list(range(len(patterns))),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+            )
+            return db
+        except Exception as e:
+            logger.warning(f"Hyperscan compile failed, using re patterns: {e}")
+            return None
+
+    def _pattern_scores(self, q: str) -> tuple[int, int]:
+        """Count the SQL and semantic intent patterns matching a lowercased query.
+        
+        Hyperscan's word boundaries only know ASCII word characters (and are
+        unsupported in its Unicode mode), so non-ASCII queries use the re
+        patterns; on ASCII text both backends agree.
+        """
+        if self._pattern_db is None or not q.isascii():
+            return (sum(1 for pattern in self.sql_patterns if pattern.search(q)),
+                    sum(1 for pattern in self.semantic_patterns if pattern.search(q)))
+        
+        matched = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched.add(pattern_id)
+        
+        self._pattern_db.scan(q.encode(), match_event_handler=on_match)
+        sql_hits = sum(1 for pattern_id in matched if pattern_id < len(self.sql_patterns))
+        return sql_hits, len(matched) - sql_hits
+
     async def _extract_entities(self, query: str) -> Dict[str, Any]:
         """Extract relevant entities from query"""
         entities = {}
         
         # Extract numeric values
-        numbers = re.findall(r'-?\d+\.?\d*', query)
+        numbers = _NUM_RE.findall(query)
         if numbers:
             entities['numbers'] = [float(n) for n in numbers]
         
         # Extract dates
-        dates = re.findall(r'\d{4}-\d{2}-\d{2}', query)
+        dates = _DATE_RE.findall(query)
         if dates:
             entities['dates'] = dates
         
-        # Extract oceanographic terms
-        ocean_terms = ['temperature', 'salinity', 'pressure', 'depth', 
-                      'latitude', 'longitude', 'pacific', 'atlantic', 'indian']
-        found_terms = [term for term in ocean_terms if term in query.lower()]
+        # Extract oceanographic terms in one scan, reported in _OCEAN_TERMS order
+        present = set(_OCEAN_TERM_RE.findall(query.lower()))
+        found_terms = [term for term in _OCEAN_TERMS if term in present]
         if found_terms:
             entities['ocean_terms'] = found_terms
         
         return entities
 
-    async def _llm_classify(self, query: str) -> tuple[QueryIntent, float]:
-        """Use LLM for intent classification"""
+    async def _llm_classify(self, query: str, query_embedding: Optional[List[float]] = None) -> tuple[QueryIntent, float]:
+        """Classify with the local embedding router, falling back to the LLM when unsure"""
+        routed = await self._route(query, query_embedding)
+        if routed is not None and routed[1] >= self.ROUTER_MIN_CONFIDENCE:
+            return routed
+        
         try:
-            response = await self.openai.chat.completions.create(
+            response = await _chat_completion(
+                self.openai,
                 model="gpt-4",
                 messages=[
                     {
@@ -175,30 +439,94 @@ class IntentClassifier:
                 temperature=0.1
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = _json_loads(response.choices[0].message.content)
             intent_str = result.get('intent', 'unknown')
             confidence = result.get('confidence', 0.5)
             
-            intent_map = {
-                'sql': QueryIntent.SQL_QUERY,
-                'semantic': QueryIntent.SEMANTIC_SEARCH,
-                'hybrid': QueryIntent.HYBRID
-            }
-            
-            return intent_map.get(intent_str, QueryIntent.UNKNOWN), confidence
+            return _INTENT_BY_LABEL.get(intent_str, QueryIntent.UNKNOWN), confidence
             
         except Exception as e:
             logger.error(f"LLM classification failed: {e}")
             return QueryIntent.SEMANTIC_SEARCH, 0.5
 
+    async def _route(self, query: str, query_embedding: Optional[List[float]] = None) -> Optional[tuple[QueryIntent, float]]:
+        """Vote among the nearest labeled seed queries; None if embeddings are unavailable"""
+        if self.embedder is None:
+            return None
+        
+        try:
+            if self._router is None:
+                texts = [text for examples in _ROUTER_EXAMPLES.values() for text in examples]
+                labels = [label for label, examples in _ROUTER_EXAMPLES.items() for _ in examples]
+                # Concurrent embeds are coalesced into one batched request
+                vectors = np.asarray(await asyncio.gather(*(self.embedder.embed(t) for t in texts)), dtype=np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                self._router = (vectors, np.array(labels))
+            
+            if query_embedding is None:
+                query_embedding = await self.embedder.embed(query)
+        except Exception as e:
+            logger.warning(f"Embedding router unavailable: {e}")
+            return None
+        
+        vectors, labels = self._router
+        vec = np.asarray(query_embedding, dtype=np.float32)
+        similarities = vectors @ (vec / np.linalg.norm(vec))
+        nearest = np.argsort(similarities)[-self.ROUTER_K:]
+        
+        # Similarity-weighted vote of the nearest seeds
+        weights = np.clip(similarities[nearest], 0.0, None)
+        votes = {}
+        for label, weight in zip(labels[nearest], weights):
+            votes[label] = votes.get(label, 0.0) + float(weight)
+        total = sum(votes.values())
+        if total <= 0:
+            return None
+        
+        label = max(votes, key=votes.get)
+        return _INTENT_BY_LABEL[label], votes[label] / total
+
 class SQLQueryGenerator:
     """Generates SQL queries from natural language"""
     
-    def __init__(self, openai_client: OpenAI):
+    def __init__(self, openai_client: AsyncOpenAI, cache_size: int = 1024):
         self.openai = openai_client
+        self.cache_size = cache_size
+        # (normalized query, entities) -> SQL, LRU-ordered
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        # Paraphrases: query embedding -> (entities, SQL); entities must match exactly,
+        # since "temperature > 25" and "temperature > 30" embed almost identically
+        self._semantic_cache = SemanticCache(threshold=0.95, ttl=float('inf'), max_size=cache_size)
 
     async def generate_sql(self, query: str, context: QueryContext) -> str:
-        """Generate SQL query from natural language"""
+        """Generate SQL query from natural language, reusing SQL for repeated or paraphrased queries"""
+        entities = _entities_key(context.extracted_entities)
+        key = (_normalize_query(query), entities)
+        
+        sql_query = self._cache.get(key)
+        if sql_query is not None:
+            self._cache.move_to_end(key)
+            return sql_query
+        
+        if context.query_embedding is not None:
+            cached = self._semantic_cache.get(context.query_embedding)
+            if cached is not None and cached[0] == entities:
+                return cached[1]
+        
+        sql_query = await self._generate_sql(query, context)
+        if sql_query is None:
+            # Fallback to basic query; not cached so the next attempt retries the LLM
+            return "SELECT * FROM argo_profiles ORDER BY date DESC LIMIT 10"
+        
+        self._cache[key] = sql_query
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        if context.query_embedding is not None:
+            self._semantic_cache.put(context.query_embedding, (entities, sql_query))
+        return sql_query
+
+    async def _generate_sql(self, query: str, context: QueryContext) -> Optional[str]:
+        """Ask the LLM for SQL; None if generation fails"""
         
         schema_info = """
         ARGO Profiles Table Schema:
@@ -219,7 +547,8 @@ class SQLQueryGenerator:
         """
         
         try:
-            response = await self.openai.chat.completions.create(
+            response = await _chat_completion(
+                self.openai,
                 model="gpt-4",
                 messages=[
                     {
@@ -241,23 +570,33 @@ class SQLQueryGenerator:
             
             sql_query = response.choices[0].message.content.strip()
             
-            # Clean up the SQL query
-            sql_query = re.sub(r'^```sql\s*', '', sql_query)
-            sql_query = re.sub(r'\s*```$', '', sql_query)
+            # Clean up the SQL query: strip a ```sql ... ``` Markdown fence
+            sql_query = sql_query.removeprefix('```sql').removesuffix('```').strip()
             
             return sql_query
             
         except Exception as e:
             logger.error(f"SQL generation failed: {e}")
-            # Fallback to basic query
-            return "SELECT * FROM argo_profiles ORDER BY date DESC LIMIT 10"
+            return None
 
 class MCPClient:
     """MCP Client for communicating with ARGO MCP Server"""
     
-    def __init__(self, server_path: str = "node server/mcp/index.js"):
+    # Reconnect attempts after a hung or dropped session, backing off from this delay
+    RECONNECT_ATTEMPTS = 3
+    RECONNECT_BACKOFF = 0.5
+    
+    def __init__(self, server_path: str = "node server/mcp/index.js",
+                 call_timeout: float = 60.0, max_concurrency: int = 8):
         self.server_path = server_path
         self.session: Optional[ClientSession] = None
+        self.call_timeout = call_timeout
+        # Bounds in-flight tool calls to what the server can work on at once
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Bumped on every successful connect, so concurrent failures of the
+        # same session trigger only one reconnect
+        self._session_generation = 0
+        self._reconnect_lock = asyncio.Lock()
 
     async def connect(self):
         """Connect to MCP server"""
@@ -268,6 +607,7 @@ class MCPClient:
             )
             
             self.session = await stdio_client(server_params)
+            self._session_generation += 1
             logger.info("Connected to MCP server")
             
         except Exception as e:
@@ -280,13 +620,48 @@ class MCPClient:
             await self.session.close()
             self.session = None
 
+    async def _reconnect(self, failed_generation: int):
+        """Replace the failed session, retrying with exponential backoff.
+        
+        A no-op if another caller already replaced that session.
+        """
+        async with self._reconnect_lock:
+            if self._session_generation != failed_generation:
+                return
+            
+            try:
+                await self.disconnect()
+            except Exception as e:
+                logger.warning(f"Error closing MCP session: {e}")
+                self.session = None
+            
+            for attempt in range(self.RECONNECT_ATTEMPTS):
+                try:
+                    await self.connect()
+                    return
+                except Exception:
+                    if attempt == self.RECONNECT_ATTEMPTS - 1:
+                        raise
+                    await asyncio.sleep(self.RECONNECT_BACKOFF * 2 ** attempt)
+
+    async def _call_tool(self, name: str, arguments: Dict[str, Any]):
+        """Call a tool with a hard timeout, reconnecting and retrying once if it hangs or drops"""
+        async with self._semaphore:
+            generation = self._session_generation
+            try:
+                return await asyncio.wait_for(self.session.call_tool(name, arguments), self.call_timeout)
+            except (asyncio.TimeoutError, ConnectionError) as e:
+                logger.warning(f"MCP call {name} failed ({e!r}), reconnecting")
+                await self._reconnect(generation)
+                return await asyncio.wait_for(self.session.call_tool(name, arguments), self.call_timeout)
+
     async def query_argo_sql(self, sql: str, page: int = 1, page_size: int = 100) -> Dict[str, Any]:
         """Execute SQL query via MCP"""
         if not self.session:
             raise RuntimeError("MCP client not connected")
         
         try:
-            result = await self.session.call_tool(
+            result = await self._call_tool(
                 "queryARGO",
                 {
                     "sql": sql,
@@ -295,38 +670,132 @@ class MCPClient:
                 }
             )
             
-            return result.content[0].text if result.content else {}
+            return _tool_result_data(result)
             
         except Exception as e:
             logger.error(f"SQL query via MCP failed: {e}")
             raise
 
-    async def retrieve_argo_semantic(self, query: str, limit: int = 10) -> Dict[str, Any]:
-        """Perform semantic search via MCP"""
+    async def retrieve_argo_semantic(self, query: str, limit: int = 10,
+                                     query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Perform semantic search via MCP, reusing the query embedding when given"""
         if not self.session:
             raise RuntimeError("MCP client not connected")
         
+        arguments = {
+            "query": query,
+            "limit": limit
+        }
+        if query_embedding is not None:
+            arguments["queryEmbedding"] = query_embedding
+        
         try:
-            result = await self.session.call_tool(
-                "retrieveARGO",
-                {
-                    "query": query,
-                    "limit": limit
-                }
-            )
+            result = await self._call_tool("retrieveARGO", arguments)
             
-            return result.content[0].text if result.content else {}
+            return _tool_result_data(result)
             
         except Exception as e:
             logger.error(f"Semantic search via MCP failed: {e}")
             raise
 
+    async def hybrid_argo(self, sql: str, query: str, limit: int = 10,
+                          query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Execute SQL query and semantic search together in one MCP call"""
+        if not self.session:
+            raise RuntimeError("MCP client not connected")
+        
+        arguments = {
+            "sql": sql,
+            "query": query,
+            "limit": limit
+        }
+        if query_embedding is not None:
+            arguments["queryEmbedding"] = query_embedding
+        
+        try:
+            result = await self._call_tool("hybridARGO", arguments)
+            
+            return _tool_result_data(result)
+            
+        except Exception as e:
+            logger.error(f"Hybrid query via MCP failed: {e}")
+            raise
+
+class LazyProfiles(Sequence):
+    """Read-only list view of ARGOResult dicts, each built on first access.
+    
+    While a response is generated, merged_data["profiles"] is only sampled
+    (the prompt reads the first three). RAGResponse.merged_data gets a plain
+    list from to_list(), reusing the rows already converted.
+    """
+    
+    __slots__ = ("_results", "_rows")
+    
+    def __init__(self, results: List[ARGOResult]):
+        self._results = results
+        self._rows: List[Optional[Dict[str, Any]]] = [None] * len(results)
+    
+    def __len__(self) -> int:
+        return len(self._results)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self._results)))]
+        if index < 0:
+            index += len(self._results)
+        if not 0 <= index < len(self._results):
+            raise IndexError("profile index out of range")
+        return self._row(index)
+    
+    def _row(self, index: int) -> Dict[str, Any]:
+        row = self._rows[index]
+        if row is None:
+            row = self._rows[index] = self._results[index].to_dict()
+        return row
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [self._row(i) for i in range(len(self._results))]
+
+_SUMMARY_DTYPE = np.dtype([('lat', 'f8'), ('lon', 'f8'), ('temp', 'f8'), ('sal', 'f8')])
+
+def _nan_if_none(value: Optional[float]) -> float:
+    return np.nan if value is None else value
+
+def _value_range(values: np.ndarray) -> Optional[List[float]]:
+    """[min, max] of the non-missing values, or None if there are none"""
+    if not np.any(~np.isnan(values)):
+        return None
+    return [float(np.nanmin(values)), float(np.nanmax(values))]
+
+def _variable_range(values: np.ndarray) -> Dict[str, Optional[float]]:
+    """min/max/mean of the non-missing values, all None if there are none"""
+    bounds = _value_range(values)
+    if bounds is None:
+        return {"min": None, "max": None, "mean": None}
+    return {"min": bounds[0], "max": bounds[1], "mean": float(np.nanmean(values))}
+
 class RAGPipeline:
     """Main RAG Pipeline orchestrator"""
     
+    # Query text -> embedding, shared by the response cache, intent router and MCP semantic search
+    EMBEDDING_CACHE_SIZE = 4096
+    # Normalized query text -> (response, stored_at), checked before embedding
+    EXACT_CACHE_SIZE = 512
+    
     def __init__(self, openai_api_key: str, mcp_server_path: str = "node server/mcp/index.js"):
-        self.openai = OpenAI(api_key=openai_api_key)
-        self.intent_classifier = IntentClassifier(self.openai)
+        # One client for every stage, so all requests share its connection pool
+        self.openai = AsyncOpenAI(api_key=openai_api_key, max_retries=OPENAI_MAX_RETRIES)
+        # Paraphrased queries are answered from earlier responses
+        self.embedder = BatchEmbedder(self.openai, model="text-embedding-3-small")
+        # Query embedding -> (entities, response); entities must match exactly, since
+        # "temperature > 25" and "temperature > 30" embed almost identically
+        self.response_cache = SemanticCache(threshold=0.92)
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._exact_responses: "OrderedDict[str, tuple]" = OrderedDict()
+        # Normalized query text -> the task answering it, shared by concurrent callers
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        
+        self.intent_classifier = IntentClassifier(self.openai, self.embedder)
         self.sql_generator = SQLQueryGenerator(self.openai)
         self.mcp_client = MCPClient(mcp_server_path)
 
@@ -338,28 +807,45 @@ class RAGPipeline:
     async def shutdown(self):
         """Shutdown the RAG pipeline"""
         await self.mcp_client.disconnect()
+        await self.embedder.close()
         logger.info("RAG Pipeline shutdown")
 
     async def process_query(self, query: str) -> RAGResponse:
-        """Process a natural language query through the RAG pipeline"""
+        """Process a natural language query through the RAG pipeline.
+        
+        Queries that differ only in case or whitespace are answered from the
+        exact-match cache, or join the run already in flight for that query.
+        """
         start_time = datetime.now()
+        key = _query_key(query)
+        
+        cached = self._exact_response(key, start_time)
+        if cached is not None:
+            return cached
+        
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._process_query(query, start_time))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight query: {query}")
         
+        # Shielded so one caller's cancellation doesn't cancel the shared run
+        return await asyncio.shield(task)
+
+    async def _process_query(self, query: str, start_time: datetime) -> RAGResponse:
         try:
-            # Step 1: Classify intent
             logger.info(f"Processing query: {query}")
-            context = await self.intent_classifier.classify_intent(query)
-            logger.info(f"Classified intent: {context.intent.value} (confidence: {context.confidence:.2f})")
             
-            # Step 2: Execute retrieval strategy
-            if context.intent == QueryIntent.SQL_QUERY:
-                results = await self._execute_sql_mode(query, context)
-            elif context.intent == QueryIntent.SEMANTIC_SEARCH:
-                results = await self._execute_semantic_mode(query, context)
-            elif context.intent == QueryIntent.HYBRID:
-                results = await self._execute_hybrid_mode(query, context)
-            else:
-                # Default to semantic search
-                results = await self._execute_semantic_mode(query, context)
+            # Serve near-duplicate queries without rerunning the pipeline
+            query_embedding = await self._embed_query(query)
+            cached = await self._cached_response(query, query_embedding, start_time)
+            if cached is not None:
+                return cached
+            
+            # Steps 1-2: Classify intent and execute retrieval strategy
+            context, results = await self._retrieve(query, query_embedding)
             
             # Step 3: Merge results into structured format
             merged_data = self._merge_results(results, context)
@@ -367,26 +853,175 @@ class RAGPipeline:
             # Step 4: Generate natural language response
             nl_response = await self._generate_response(query, merged_data, context)
             
-            execution_time = (datetime.now() - start_time).total_seconds()
-            
-            return RAGResponse(
-                query=query,
-                intent=context.intent,
-                results=results,
-                merged_data=merged_data,
-                natural_language_response=nl_response,
-                metadata={
-                    "execution_time": execution_time,
-                    "timestamp": datetime.now().isoformat(),
-                    "confidence": context.confidence,
-                    "result_count": len(results)
-                }
-            )
+            return self._finish_response(query, context, results, merged_data,
+                                         nl_response, start_time, query_embedding)
             
         except Exception as e:
             logger.error(f"Query processing failed: {e}")
             raise
 
+    async def process_queries(self, queries: List[str], max_concurrency: int = 8) -> List[Union[RAGResponse, Exception]]:
+        """Process a batch of queries concurrently, in input order.
+        
+        At most max_concurrency queries run at once; OpenAI and MCP calls are
+        additionally bounded process-wide. A failed query yields its exception
+        in place of a response instead of cancelling the rest of the batch.
+        """
+        slots = asyncio.Semaphore(max_concurrency)
+        
+        async def run(query: str) -> Union[RAGResponse, Exception]:
+            async with slots:
+                try:
+                    return await self.process_query(query)
+                except Exception as e:
+                    return e
+        
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(run(query)) for query in queries]
+        return [task.result() for task in tasks]
+
+    async def process_query_stream(self, query: str) -> AsyncIterator[str]:
+        """Process a query like process_query, yielding the answer text as it is generated.
+        
+        Retrieval runs to completion first; the LLM answer is then streamed so
+        callers can show the first tokens immediately. The complete response
+        is cached for later process_query / process_query_stream calls.
+        """
+        start_time = datetime.now()
+        logger.info(f"Processing query (streaming): {query}")
+        
+        cached = self._exact_response(_query_key(query), start_time)
+        if cached is not None:
+            yield cached.natural_language_response
+            return
+        
+        query_embedding = await self._embed_query(query)
+        cached = await self._cached_response(query, query_embedding, start_time)
+        if cached is not None:
+            yield cached.natural_language_response
+            return
+        
+        context, results = await self._retrieve(query, query_embedding)
+        merged_data = self._merge_results(results, context)
+        
+        parts = []
+        async for chunk in self._stream_response(query, merged_data, context):
+            parts.append(chunk)
+            yield chunk
+        
+        self._finish_response(query, context, results, merged_data,
+                              "".join(parts), start_time, query_embedding)
+
+    async def _cached_response(self, query: str, query_embedding: Optional[List[float]],
+                               start_time: datetime) -> Optional[RAGResponse]:
+        """Return the cached response for a near-duplicate query with the same entities, if any"""
+        if query_embedding is None:
+            return None
+        cached = self.response_cache.get(query_embedding)
+        if cached is None:
+            return None
+        
+        entities = _entities_key(await self.intent_classifier._extract_entities(query))
+        if cached[0] != entities:
+            return None
+        
+        logger.info("Semantic cache hit")
+        return self._cache_hit(cached[1], start_time)
+
+    def _exact_response(self, key: str, start_time: datetime) -> Optional[RAGResponse]:
+        """Return the cached response for the same normalized query, if any"""
+        entry = self._exact_responses.get(key)
+        if entry is None:
+            return None
+        
+        cached, stored_at = entry
+        if time.monotonic() - stored_at > self.response_cache.ttl:
+            del self._exact_responses[key]
+            return None
+        
+        self._exact_responses.move_to_end(key)
+        logger.info("Exact cache hit")
+        return self._cache_hit(cached, start_time)
+
+    def _cache_hit(self, cached: RAGResponse, start_time: datetime) -> RAGResponse:
+        """Copy of a cached response with this request's timing metadata"""
+        return replace(cached, metadata={
+            **cached.metadata,
+            "execution_time": (datetime.now() - start_time).total_seconds(),
+            "timestamp": datetime.now().isoformat(),
+            "cache_hit": True
+        })
+
+    async def _retrieve(self, query: str, query_embedding: Optional[List[float]]) -> tuple[QueryContext, List[ARGOResult]]:
+        """Classify the query's intent and run the matching retrieval strategy"""
+        context = await self.intent_classifier.classify_intent(query, query_embedding)
+        logger.info(f"Classified intent: {context.intent.value} (confidence: {context.confidence:.2f})")
+        
+        if context.intent == QueryIntent.SQL_QUERY:
+            results = await self._execute_sql_mode(query, context)
+        elif context.intent == QueryIntent.SEMANTIC_SEARCH:
+            results = await self._execute_semantic_mode(query, context)
+        elif context.intent == QueryIntent.HYBRID:
+            results = await self._execute_hybrid_mode(query, context)
+        else:
+            # Default to semantic search
+            results = await self._execute_semantic_mode(query, context)
+        
+        return context, results
+
+    def _finish_response(self, query: str, context: QueryContext, results: List[ARGOResult],
+                         merged_data: Dict[str, Any], nl_response: str, start_time: datetime,
+                         query_embedding: Optional[List[float]]) -> RAGResponse:
+        """Build the final RAGResponse and store it in the response caches"""
+        execution_time = (datetime.now() - start_time).total_seconds()
+        
+        # Callers get a plain, json-serializable list of profiles
+        profiles = merged_data.get("profiles")
+        if isinstance(profiles, LazyProfiles):
+            merged_data = {**merged_data, "profiles": profiles.to_list()}
+        
+        response = RAGResponse(
+            query=query,
+            intent=context.intent,
+            results=results,
+            merged_data=merged_data,
+            natural_language_response=nl_response,
+            metadata={
+                "execution_time": execution_time,
+                "timestamp": datetime.now().isoformat(),
+                "confidence": context.confidence,
+                "result_count": len(results)
+            }
+        )
+        
+        if query_embedding is not None:
+            self.response_cache.put(query_embedding, (_entities_key(context.extracted_entities), response))
+        
+        key = _query_key(query)
+        self._exact_responses[key] = (response, time.monotonic())
+        self._exact_responses.move_to_end(key)
+        if len(self._exact_responses) > self.EXACT_CACHE_SIZE:
+            self._exact_responses.popitem(last=False)
+        return response
+
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a query once for every stage that needs it, or None if embedding fails"""
+        embedding = self._embeddings.get(query)
+        if embedding is not None:
+            self._embeddings.move_to_end(query)
+            return embedding
+        
+        try:
+            embedding = await self.embedder.embed(query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed, skipping semantic cache: {e}")
+            return None
+        
+        self._embeddings[query] = embedding
+        if len(self._embeddings) > self.EMBEDDING_CACHE_SIZE:
+            self._embeddings.popitem(last=False)
+        return embedding
+
     async def _execute_sql_mode(self, query: str, context: QueryContext) -> List[ARGOResult]:
         """Execute SQL-based retrieval"""
         logger.info("Executing SQL mode")
@@ -409,7 +1044,8 @@ class RAGPipeline:
         context.semantic_query = query
         
         # Execute semantic search via MCP
-        raw_results = await self.mcp_client.retrieve_argo_semantic(query)
+        raw_results = await self.mcp_client.retrieve_argo_semantic(
+            query, query_embedding=context.query_embedding)
         
         # Convert to structured format
         return self._convert_semantic_results(raw_results)
@@ -418,35 +1054,47 @@ class RAGPipeline:
         """Execute hybrid SQL + semantic retrieval"""
         logger.info("Executing hybrid mode")
         
-        # Execute both strategies
-        sql_results = await self._execute_sql_mode(query, context)
-        semantic_results = await self._execute_semantic_mode(query, context)
+        sql_query = await self.sql_generator.generate_sql(query, context)
+        context.sql_query = sql_query
+        context.semantic_query = query
+        logger.info(f"Generated SQL: {sql_query}")
         
-        # Merge and deduplicate results
-        combined_results = {}
+        # Both strategies run server-side in a single MCP round trip
+        raw_results = await self.mcp_client.hybrid_argo(
+            sql_query, query, query_embedding=context.query_embedding)
+        payload = raw_results.get('data', {})
+        sql_results = self._convert_sql_results(payload.get('sql', {}))
+        semantic_results = self._convert_semantic_results(payload.get('semantic', {}))
         
-        # Add SQL results
-        for result in sql_results:
-            combined_results[result.id] = result
+        # Merge and deduplicate results by id; profiles without an id can't be
+        # matched up, so they are kept as-is rather than collapsed onto ''
+        combined_results = {result.id: result for result in sql_results if result.id}
+        unidentified = [result for result in sql_results if not result.id]
         
         # Add semantic results, preserving similarity scores
         for result in semantic_results:
-            if result.id in combined_results:
+            if not result.id:
+                unidentified.append(result)
+                continue
+            existing = combined_results.get(result.id)
+            if existing is not None:
                 # Update with similarity score
-                combined_results[result.id].similarity_score = result.similarity_score
-                combined_results[result.id].rag_context = result.rag_context
+                combined_results[result.id] = replace(
+                    existing,
+                    similarity_score=result.similarity_score,
+                    rag_context=result.rag_context
+                )
             else:
                 combined_results[result.id] = result
         
-        return list(combined_results.values())
+        return [*combined_results.values(), *unidentified]
 
     def _convert_sql_results(self, raw_results: Dict[str, Any]) -> List[ARGOResult]:
         """Convert SQL results to structured format"""
         results = []
         
         try:
-            data = json.loads(raw_results) if isinstance(raw_results, str) else raw_results
-            profiles = data.get('data', {}).get('data', [])
+            profiles = raw_results.get('data', {}).get('data', [])
             
             for profile in profiles:
                 result = ARGOResult(
@@ -488,9 +1136,8 @@ class RAGPipeline:
         results = []
         
         try:
-            data = json.loads(raw_results) if isinstance(raw_results, str) else raw_results
-            search_results = data.get('data', {}).get('profiles', [])
-            similarities = data.get('data', {}).get('similarities', [])
+            search_results = raw_results.get('data', {}).get('profiles', [])
+            similarities = raw_results.get('data', {}).get('similarities', [])
             
             for i, profile in enumerate(search_results):
                 similarity = similarities[i] if i < len(similarities) else 0.0
@@ -534,18 +1181,15 @@ class RAGPipeline:
     def _merge_results(self, results: List[ARGOResult], context: QueryContext) -> Dict[str, Any]:
         """Merge results into structured JSON output"""
         
-        # Calculate summary statistics
-        if results:
-            latitudes = [r.location['latitude'] for r in results]
-            longitudes = [r.location['longitude'] for r in results]
-            
-            temps = [r.variables.get('temperature', {}).get('surface') 
-                    for r in results if r.variables.get('temperature', {}).get('surface') is not None]
-            
-            salts = [r.variables.get('salinity', {}).get('surface') 
-                    for r in results if r.variables.get('salinity', {}).get('surface') is not None]
-        else:
-            latitudes = longitudes = temps = salts = []
+        # Calculate summary statistics in one pass into a structured array
+        stats = np.fromiter(
+            ((_nan_if_none(r.location['latitude']), _nan_if_none(r.location['longitude']),
+              _nan_if_none(r.variables.get('temperature', {}).get('surface')),
+              _nan_if_none(r.variables.get('salinity', {}).get('surface')))
+             for r in results),
+            dtype=_SUMMARY_DTYPE,
+            count=len(results)
+        )
         
         merged = {
             "query_context": {
@@ -558,69 +1202,70 @@ class RAGPipeline:
             "results_summary": {
                 "total_profiles": len(results),
                 "geographic_bounds": {
-                    "lat_range": [min(latitudes), max(latitudes)] if latitudes else [0, 0],
-                    "lon_range": [min(longitudes), max(longitudes)] if longitudes else [0, 0]
+                    "lat_range": _value_range(stats['lat']) or [0, 0],
+                    "lon_range": _value_range(stats['lon']) or [0, 0]
                 },
                 "variable_ranges": {
-                    "temperature": {
-                        "min": min(temps) if temps else None,
-                        "max": max(temps) if temps else None,
-                        "mean": sum(temps) / len(temps) if temps else None
-                    },
-                    "salinity": {
-                        "min": min(salts) if salts else None,
-                        "max": max(salts) if salts else None,
-                        "mean": sum(salts) / len(salts) if salts else None
-                    }
+                    "temperature": _variable_range(stats['temp']),
+                    "salinity": _variable_range(stats['sal'])
                 }
             },
-            "profiles": [asdict(result) for result in results]
+            "profiles": LazyProfiles(results)
         }
         
         return merged
 
+    def _response_messages(self, query: str, merged_data: Dict[str, Any], context: QueryContext) -> List[Dict[str, str]]:
+        """Build the answer-generation prompt, trimmed to RESPONSE_PROMPT_TOKEN_BUDGET"""
+        summary = merged_data["results_summary"]
+        ranges = summary["variable_ranges"]
+        bounds = summary["geographic_bounds"]
+        
+        # Include sample profiles for context, copied so fields can be dropped
+        samples = [dict(profile) for profile in merged_data["profiles"][:3]]
+        
+        def render() -> str:
+            return _RESPONSE_USER_TEMPLATE.format(
+                query=query,
+                intent=context.intent.value,
+                total=summary["total_profiles"],
+                lat_range=_format_bounds(bounds["lat_range"]),
+                lon_range=_format_bounds(bounds["lon_range"]),
+                temperature=_format_variable_range(ranges["temperature"]),
+                salinity=_format_variable_range(ranges["salinity"]),
+                samples="\n".join(_json_dumps(sample) for sample in samples) or "(none)"
+            )
+        
+        # Drop the least useful sample fields until the prompt fits the budget
+        user_content = render()
+        for field_name in (*_SAMPLE_FIELD_DROP_ORDER, None):
+            if count_tokens(_RESPONSE_SYSTEM_PROMPT + user_content, "gpt-4") <= RESPONSE_PROMPT_TOKEN_BUDGET:
+                break
+            if field_name is None:
+                samples = []
+            else:
+                for sample in samples:
+                    sample.pop(field_name, None)
+            user_content = render()
+        
+        return [
+            {"role": "system", "content": _RESPONSE_SYSTEM_PROMPT},
+            {"role": "user", "content": user_content}
+        ]
+
+    def _fallback_response(self, query: str, merged_data: Dict[str, Any]) -> str:
+        """Canned answer used when the LLM is unavailable"""
+        total = merged_data["results_summary"]["total_profiles"]
+        return f"Found {total} ARGO profiles matching your query '{query}'. The data includes oceanographic measurements from various locations and time periods. Please check the detailed results for specific values and metadata."
+
     async def _generate_response(self, query: str, merged_data: Dict[str, Any], context: QueryContext) -> str:
         """Generate natural language response using LLM"""
         
         try:
-            # Create a concise summary for the LLM
-            summary = {
-                "query": query,
-                "intent": context.intent.value,
-                "total_results": merged_data["results_summary"]["total_profiles"],
-                "geographic_bounds": merged_data["results_summary"]["geographic_bounds"],
-                "variable_ranges": merged_data["results_summary"]["variable_ranges"]
-            }
-            
-            # Include sample profiles for context
-            sample_profiles = merged_data["profiles"][:3]  # First 3 profiles
-            
-            response = await self.openai.chat.completions.create(
+            response = await _chat_completion(
+                self.openai,
                 model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert oceanographer providing insights on ARGO profile data.
-                        Generate a comprehensive, natural language response that:
-                        1. Directly answers the user's query
-                        2. Summarizes key findings from the data
-                        3. Provides oceanographic context and interpretation
-                        4. Mentions data quality and limitations if relevant
-                        5. Uses scientific terminology appropriately
-                        
-                        Be concise but informative. Focus on the most relevant insights."""
-                    },
-                    {
-                        "role": "user",
-                        "content": f"""User Query: "{query}"
-                        
-                        Data Summary: {json.dumps(summary, indent=2)}
-                        
-                        Sample Profiles: {json.dumps(sample_profiles, indent=2)}
-                        
-                        Please provide a comprehensive response to the user's query based on this ARGO data."""
-                    }
-                ],
+                messages=self._response_messages(query, merged_data, context),
                 temperature=0.3,
                 max_tokens=1000
             )
@@ -631,8 +1276,31 @@ class RAGPipeline:
             logger.error(f"Response generation failed: {e}")
             
             # Fallback response
-            total = merged_data["results_summary"]["total_profiles"]
-            return f"Found {total} ARGO profiles matching your query '{query}'. The data includes oceanographic measurements from various locations and time periods. Please check the detailed results for specific values and metadata."
+            return self._fallback_response(query, merged_data)
+
+    async def _stream_response(self, query: str, merged_data: Dict[str, Any], context: QueryContext) -> AsyncIterator[str]:
+        """Stream the natural language response from the LLM as it is generated"""
+        streamed = False
+        try:
+            # Hold the completion slot for the whole stream, not just the request
+            async with _completion_slots():
+                stream = await self.openai.chat.completions.create(
+                    model="gpt-4",
+                    messages=self._response_messages(query, merged_data, context),
+                    temperature=0.3,
+                    max_tokens=1000,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        streamed = True
+                        yield chunk.choices[0].delta.content
+                        
+        except Exception as e:
+            logger.error(f"Response streaming failed: {e}")
+            # A partial answer is kept; only fall back if nothing was sent
+            if not streamed:
+                yield self._fallback_response(query, merged_data)
 
 # Example usage and testing
 async def main():
@@ -0,0 +1,181 @@
+"""
+Semantic response cache for the ARGO agents.
+
+Near-duplicate queries ("warm water Indian Ocean" vs "warm Indian Ocean profiles")
+map to nearby embeddings, so a cosine lookup over previously answered queries
+lets us skip the MCP fetch and the LLM round-trip entirely.
+"""
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """Embedding-keyed response cache backed by a FAISS HNSW inner-product index"""
+
+    # Nearest neighbours fetched per lookup, so evicted vectors still in the
+    # graph don't hide a live match behind them
+    SEARCH_K = 8
+
+    def __init__(self, dim: int = 1536, threshold: float = 0.9,
+                 ttl: float = 300.0, max_size: int = 1000, hnsw_m: int = 32,
+                 ef_construction: int = 200, ef_search: int = 64):
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+
+        # Vectors are L2-normalized, so inner product == cosine similarity.
+        # HNSW keeps lookups sub-linear as the cache grows, but cannot delete
+        # vectors: evicted ids are left in the graph, skipped at search time,
+        # and purged by rebuilding once they outnumber the live entries.
+        self._index = self._build_hnsw_index()
+        self._dead_count = 0
+        # id -> (vector, response, inserted_at); ordered oldest-used first for LRU eviction
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _build_hnsw_index(self):
+        hnsw = faiss.IndexHNSWFlat(self.dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = self.ef_construction
+        hnsw.hnsw.efSearch = self.ef_search
+        return faiss.IndexIDMap(hnsw)
+
+    def _live_vectors(self):
+        """Return (vectors, ids) arrays for all live entries"""
+        ids = np.fromiter(self._entries, dtype=np.int64, count=len(self._entries))
+        vectors = np.vstack([entry[0] for entry in self._entries.values()])
+        return vectors, ids
+
+    def _normalize(self, embedding: Sequence[float]) -> np.ndarray:
+        """Return embedding as a (1, dim) float32 unit vector"""
+        vec = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(vec)
+        return vec
+
+    def _remove(self, entry_id: int):
+        if self._entries.pop(entry_id, None) is None:
+            return
+        self._dead_count += 1
+        
+        if self._dead_count > len(self._entries):
+            self._index = self._build_hnsw_index()
+            self._dead_count = 0
+            if self._entries:
+                self._index.add_with_ids(*self._live_vectors())
+
+    def get(self, embedding: Sequence[float]) -> Optional[Any]:
+        """Return the cached response for the nearest query above threshold, if any"""
+        if not self._entries:
+            return None
+
+        similarities, ids = self._index.search(self._normalize(embedding), self.SEARCH_K)
+        for similarity, entry_id in zip(similarities[0], ids[0]):
+            entry_id = int(entry_id)
+            if entry_id < 0 or similarity < self.threshold:
+                return None
+            if entry_id in self._entries:
+                break
+        else:
+            return None
+
+        _, response, inserted_at = self._entries[entry_id]
+        if time.monotonic() - inserted_at > self.ttl:
+            self._remove(entry_id)
+            return None
+
+        self._entries.move_to_end(entry_id)
+        logger.debug(f"Semantic cache hit (similarity: {similarity:.3f})")
+        return response
+
+    def put(self, embedding: Sequence[float], response: Any):
+        """Store a response, evicting the least recently used entry when full"""
+        while len(self._entries) >= self.max_size:
+            self._remove(next(iter(self._entries)))
+
+        entry_id = self._next_id
+        self._next_id += 1
+        vector = self._normalize(embedding)
+        self._index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+        self._entries[entry_id] = (vector, response, time.monotonic())
+
+class BatchEmbedder:
+    """Coalesces concurrent embedding requests into batched API calls.
+    
+    Queries arriving within max_wait seconds of each other (up to max_batch)
+    share one embeddings request, amortizing the network round-trip under load.
+    """
+
+    def __init__(self, client, model: str = "text-embedding-3-small",
+                 max_batch: int = 64, max_wait: float = 0.01):
+        self.client = client
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text, batched with any concurrent callers"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def close(self):
+        """Stop the background batching task"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._embed_batch(batch)
+
+    async def _embed_batch(self, batch: List[tuple]):
+        try:
+            response = await self.client.embeddings.create(
+                model=self.model,
+                input=[text for text, _ in batch]
+            )
+            embeddings = sorted(response.data, key=lambda item: item.index)
+            for (_, future), item in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(item.embedding)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
@@ -4,43 +4,113 @@ Comprehensive test suite for RAG + MCP pipeline validation.
 Tests SQL mode, semantic mode, and hybrid mode queries.
 """
 
+import argparse
 import asyncio
+import hashlib
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import re
+import shelve
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Mapping, Optional, Sequence
 import sys
 import os
 
 # Add the scripts directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from llm_agent import ARGOLLMAgent, MCPToolResponse
+from llm_agent import ARGOLLMAgent, MCPToolResponse, PROMPT_CACHE_KEY
+from test_queries import TestQueryLibrary
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _json_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serialize JSON to bytes, preferring orjson when installed; unknown types become strings"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=str, indent=2 if indent else None).encode()
+
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern[str]":
+    """Case-insensitive substring match for any of keywords, in one scan"""
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+def _iso_utc(timestamp_ns: int) -> str:
+    """ISO 8601 UTC string for a time.time_ns() value"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+
+# Response components checked by _validate_response
+_COMPONENT_PATTERNS = [
+    ("raw values", _keyword_pattern(["temperature", "salinity", "pressure", "data", "profile"])),
+    ("metadata", _keyword_pattern(["location", "timestamp", "latitude", "longitude", "date"])),
+    ("summary", _keyword_pattern(["analysis", "pattern", "trend", "finding", "result"]))
+]
+_OCEANOGRAPHIC_PATTERN = _keyword_pattern(["ocean", "temperature", "salinity", "depth", "profile", "water", "marine"])
+
+# Mode -> (keywords, how many must appear, issue reported otherwise)
+_MODE_CHECKS = {
+    "SQL": (frozenset({"query", "sql"}), 1, "SQL mode should mention database querying"),
+    "SEMANTIC": (frozenset({"search", "similar"}), 1, "Semantic mode should mention search or similarity"),
+    "HYBRID": (frozenset({"query", "search", "analysis"}), 2, "Hybrid mode should show evidence of multiple approaches")
+}
+
 class RAGPipelineValidator:
     """Validates RAG + MCP pipeline with comprehensive test queries"""
     
-    def __init__(self, openai_api_key: str):
+    # Test cases within a mode run concurrently, at most this many at once
+    MAX_CONCURRENT_TESTS = 8
+    # Agent responses persisted across runs, keyed by query and agent config
+    RESPONSE_CACHE_PATH = ".rag_test_cache"
+    RESPONSE_CACHE_TTL = 86400.0
+    
+    def __init__(self, openai_api_key: str, use_cache: bool = True):
         self.agent = ARGOLLMAgent(openai_api_key)
-        self.test_results = []
+        self._test_slots = asyncio.Semaphore(self.MAX_CONCURRENT_TESTS)
+        self._response_cache = shelve.open(self.RESPONSE_CACHE_PATH) if use_cache else None
+        
+        # Full results are streamed to an NDJSON file as each test finishes;
+        # only the aggregates needed for the summary report stay in memory
+        report_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.report_file = f"rag_validation_report_{report_stamp}.json"
+        self.results_file = f"rag_validation_results_{report_stamp}.ndjson"
+        self._results_fp = open(self.results_file, 'wb')
+        self._mode_counts: Dict[str, Dict[str, int]] = {}
+        # Running (count, total, min, max) of execution times in nanoseconds
+        self._exec_count = 0
+        self._exec_total_ns = 0
+        self._exec_min_ns = 0
+        self._exec_max_ns = 0
+        self._issue_counts = Counter()
+        self._failures: List[tuple] = []
+        self._results_window_ns: Optional[tuple] = None
+        
+    def close(self):
+        """Close the results file and the persistent response cache"""
+        self._results_fp.close()
+        if self._response_cache is not None:
+            self._response_cache.close()
+            self._response_cache = None
         
     async def run_all_tests(self):
         """Run all validation tests"""
         logger.info("Starting RAG + MCP Pipeline Validation")
         logger.info("=" * 80)
         
-        # SQL Mode Tests
-        await self._test_sql_mode()
-        
-        # Semantic Mode Tests  
-        await self._test_semantic_mode()
-        
-        # Hybrid Mode Tests
-        await self._test_hybrid_mode()
+        # SQL, semantic and hybrid mode tests run together; the per-case
+        # semaphore still caps the number of queries in flight
+        await asyncio.gather(
+            self._test_sql_mode(),
+            self._test_semantic_mode(),
+            self._test_hybrid_mode()
+        )
         
         # Generate validation report
         self._generate_validation_report()
@@ -50,101 +120,110 @@ class RAGPipelineValidator:
         logger.info("\n🔍 TESTING SQL MODE")
         logger.info("-" * 50)
         
-        sql_queries = [
-            {
-                "query": "Show me 5 profiles from the Indian Ocean in 2010",
-                "expected_tool": "queryARGO",
-                "description": "Structured query with specific location and date filters"
-            },
-            {
-                "query": "Count all ARGO profiles with temperature above 25°C in the Pacific",
-                "expected_tool": "queryARGO", 
-                "description": "Aggregation query with temperature threshold"
-            },
-            {
-                "query": "List profiles from platform 1901393 between January and March 2023",
-                "expected_tool": "queryARGO",
-                "description": "Platform-specific query with date range"
-            },
-            {
-                "query": "Find the average salinity in the Atlantic Ocean for 2022",
-                "expected_tool": "queryARGO",
-                "description": "Statistical aggregation query"
-            }
-        ]
-        
-        for test_case in sql_queries:
-            await self._execute_test_case("SQL", test_case)
+        await self._run_test_cases("SQL", TestQueryLibrary.get_sql_mode_queries())
             
     async def _test_semantic_mode(self):
         """Test unstructured queries that should use vector search (retrieveARGO)"""
         logger.info("\n🧠 TESTING SEMANTIC MODE")
         logger.info("-" * 50)
         
-        semantic_queries = [
-            {
-                "query": "Where are the warmest waters recorded?",
-                "expected_tool": "retrieveARGO",
-                "description": "Conceptual query about temperature patterns"
-            },
-            {
-                "query": "Find profiles with unusual oceanographic conditions",
-                "expected_tool": "retrieveARGO",
-                "description": "Exploratory query for anomalies"
-            },
-            {
-                "query": "Show me deep water formations in polar regions",
-                "expected_tool": "retrieveARGO",
-                "description": "Complex oceanographic concept search"
-            },
-            {
-                "query": "Locate areas with strong thermoclines",
-                "expected_tool": "retrieveARGO",
-                "description": "Physical oceanography feature search"
-            }
-        ]
-        
-        for test_case in semantic_queries:
-            await self._execute_test_case("SEMANTIC", test_case)
+        await self._run_test_cases("SEMANTIC", TestQueryLibrary.get_semantic_mode_queries())
             
     async def _test_hybrid_mode(self):
         """Test complex queries that should use both SQL and vector search"""
         logger.info("\n🔄 TESTING HYBRID MODE")
         logger.info("-" * 50)
         
-        hybrid_queries = [
-            {
-                "query": "Compare salinity trends in Pacific vs Atlantic from 2000–2010",
-                "expected_tools": ["queryARGO", "retrieveARGO"],
-                "description": "Comparative analysis requiring both structured and semantic search"
-            },
-            {
-                "query": "Analyze temperature anomalies in the Gulf Stream region and find similar patterns globally",
-                "expected_tools": ["queryARGO", "retrieveARGO"],
-                "description": "Regional analysis with global pattern matching"
-            },
-            {
-                "query": "Find El Niño impact signatures in Pacific temperature data and compare with historical patterns",
-                "expected_tools": ["queryARGO", "retrieveARGO"],
-                "description": "Climate pattern analysis with historical comparison"
+        await self._run_test_cases("HYBRID", TestQueryLibrary.get_hybrid_mode_queries())
+            
+    async def _run_test_cases(self, mode: str, test_cases: Sequence[Mapping[str, Any]]):
+        """Execute a mode's test cases concurrently"""
+        await asyncio.gather(*(self._execute_test_case(mode, test_case) for test_case in test_cases))
+            
+    def _record_result(self, test_result: Dict[str, Any]):
+        """Append a result to the NDJSON file and fold it into the report aggregates"""
+        self._results_fp.write(_json_bytes(test_result) + b"\n")
+        self._results_fp.flush()
+        
+        validation = test_result.get("validation", {})
+        issues = validation.get("issues", [])
+        counts = self._mode_counts.setdefault(test_result["mode"], {"total": 0, "passed": 0})
+        counts["total"] += 1
+        if validation.get("passed", False):
+            counts["passed"] += 1
+        else:
+            self._failures.append((test_result["query"], issues[:3]))
+        self._issue_counts.update(issues)
+        
+        timestamp_ns = test_result["timestamp_ns"]
+        window = self._results_window_ns or (timestamp_ns, timestamp_ns)
+        self._results_window_ns = (min(window[0], timestamp_ns), max(window[1], timestamp_ns))
+        if "execution_time_ns" in test_result:
+            elapsed_ns = test_result["execution_time_ns"]
+            if self._exec_count == 0:
+                self._exec_min_ns = self._exec_max_ns = elapsed_ns
+            else:
+                self._exec_min_ns = min(self._exec_min_ns, elapsed_ns)
+                self._exec_max_ns = max(self._exec_max_ns, elapsed_ns)
+            self._exec_count += 1
+            self._exec_total_ns += elapsed_ns
+            
+    def _cache_key(self, query: str) -> str:
+        """Hash of the query and the agent settings that shape its response"""
+        config = {
+            "model": self.agent.model,
+            "embedding_model": self.agent.embedding_model,
+            "prompt": PROMPT_CACHE_KEY
+        }
+        return hashlib.blake2b(json.dumps([query, config], sort_keys=True).encode()).hexdigest()
+            
+    async def _process_query(self, query: str) -> tuple[str, int, bool]:
+        """Return (response, execution_time_ns, cached), reusing responses from earlier runs"""
+        key = self._cache_key(query) if self._response_cache is not None else None
+        if key is not None:
+            entry = self._response_cache.get(key)
+            if entry is not None and time.time() - entry["stored_at"] < self.RESPONSE_CACHE_TTL:
+                return entry["response"], entry["execution_time_ns"], True
+        
+        # Monotonic clock: wall-clock time can jump mid-query
+        start_ns = time.perf_counter_ns()
+        response = await self.agent.process_query(query)
+        execution_time_ns = time.perf_counter_ns() - start_ns
+        
+        if key is not None and self._is_cacheable(query, response):
+            self._response_cache[key] = {
+                "response": response,
+                "execution_time_ns": execution_time_ns,
+                "stored_at": time.time()
             }
-        ]
+        return response, execution_time_ns, False
+            
+    def _is_cacheable(self, query: str, response: str) -> bool:
+        """Whether a response reflects real data rather than an outage.
         
-        for test_case in hybrid_queries:
-            await self._execute_test_case("HYBRID", test_case)
+        process_query reports errors by returning its fallback text, and falls
+        back to the general help text when the data fetch fails; caching either
+        would replay a transient outage as a failed test on later runs.
+        """
+        return bool(response) and response not in (
+            self.agent._generate_fallback_response(query),
+            self.agent._generate_general_response(query)
+        )
             
-    async def _execute_test_case(self, mode: str, test_case: Dict[str, Any]):
-        """Execute a single test case and validate results"""
+    async def _execute_test_case(self, mode: str, test_case: Mapping[str, Any]):
+        """Execute a single test case and record its validated result"""
+        async with self._test_slots:
+            self._record_result(await self._run_test_case(mode, test_case))
+            
+    async def _run_test_case(self, mode: str, test_case: Mapping[str, Any]) -> Dict[str, Any]:
+        """Run the query for one test case and validate the response"""
         query = test_case["query"]
-        logger.info(f"\n📝 Testing: {query}")
-        logger.info(f"   Expected: {test_case.get('expected_tool', test_case.get('expected_tools', 'Unknown'))}")
+        logger.info("\n📝 Testing: %s", query)
+        logger.info("   Expected: %s", test_case.get('expected_tool', test_case.get('expected_tools', 'Unknown')))
         
         try:
-            # Execute query
-            start_time = datetime.now()
-            response = await self.agent.process_query(query)
-            end_time = datetime.now()
-            execution_time = (end_time - start_time).total_seconds()
+            # Execute query, or reuse the response from an earlier run
+            response, execution_time_ns, cached = await self._process_query(query)
             
             # Validate response
             validation_result = self._validate_response(response, test_case, mode)
@@ -155,32 +234,37 @@ class RAGPipelineValidator:
                 "query": query,
                 "description": test_case["description"],
                 "response": response,
-                "execution_time": execution_time,
+                "execution_time_ns": execution_time_ns,
+                "cached": cached,
                 "validation": validation_result,
-                "timestamp": datetime.now().isoformat()
+                "timestamp_ns": time.time_ns()
             }
             
-            self.test_results.append(test_result)
-            
-            # Log result
+            # Log result; concurrent cases interleave, so name the query
             status = "✅ PASS" if validation_result["passed"] else "❌ FAIL"
-            logger.info(f"   Result: {status} ({execution_time:.2f}s)")
+            if cached:
+                logger.info("   Result: %s (cached) - %s", status, query)
+            else:
+                logger.info("   Result: %s (%.2fs) - %s", status, execution_time_ns / 1e9, query)
             
-            if not validation_result["passed"]:
-                logger.warning(f"   Issues: {', '.join(validation_result['issues'])}")
+            # Only join the issue list when the warning will actually be emitted
+            if not validation_result["passed"] and logger.isEnabledFor(logging.WARNING):
+                logger.warning("   Issues: %s", ', '.join(validation_result['issues']))
+                
+            return test_result
                 
         except Exception as e:
-            logger.error(f"   Error: {str(e)}")
-            self.test_results.append({
+            logger.error("   Error: %s - %s", e, query)
+            return {
                 "mode": mode,
                 "query": query,
                 "description": test_case["description"],
                 "error": str(e),
                 "validation": {"passed": False, "issues": [f"Execution error: {str(e)}"]},
-                "timestamp": datetime.now().isoformat()
-            })
+                "timestamp_ns": time.time_ns()
+            }
             
-    def _validate_response(self, response: str, test_case: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    def _validate_response(self, response: str, test_case: Mapping[str, Any], mode: str) -> Dict[str, Any]:
         """Validate response quality and completeness"""
         issues = []
         
@@ -196,33 +280,21 @@ class RAGPipelineValidator:
                 issues.append("Expected tool usage not detected in response")
                 
         # Check for required components
-        required_components = [
-            ("raw values", ["temperature", "salinity", "pressure", "data", "profile"]),
-            ("metadata", ["location", "timestamp", "latitude", "longitude", "date"]),
-            ("summary", ["analysis", "pattern", "trend", "finding", "result"])
-        ]
-        
-        for component_name, keywords in required_components:
-            if not any(keyword.lower() in response.lower() for keyword in keywords):
+        for component_name, pattern in _COMPONENT_PATTERNS:
+            if not pattern.search(response):
                 issues.append(f"Missing {component_name} in response")
                 
         # Check for oceanographic context
-        oceanographic_terms = ["ocean", "temperature", "salinity", "depth", "profile", "water", "marine"]
-        if not any(term.lower() in response.lower() for term in oceanographic_terms):
+        if not _OCEANOGRAPHIC_PATTERN.search(response):
             issues.append("Lacks oceanographic context")
             
         # Mode-specific validations
-        if mode == "SQL":
-            if "query" not in response.lower() and "sql" not in response.lower():
-                issues.append("SQL mode should mention database querying")
-                
-        elif mode == "SEMANTIC":
-            if "search" not in response.lower() and "similar" not in response.lower():
-                issues.append("Semantic mode should mention search or similarity")
-                
-        elif mode == "HYBRID":
-            if len([tool for tool in ["query", "search", "analysis"] if tool in response.lower()]) < 2:
-                issues.append("Hybrid mode should show evidence of multiple approaches")
+        mode_check = _MODE_CHECKS.get(mode)
+        if mode_check is not None:
+            keywords, min_hits, issue = mode_check
+            response_lower = response.lower()
+            if sum(keyword in response_lower for keyword in keywords) < min_hits:
+                issues.append(issue)
                 
         return {
             "passed": len(issues) == 0,
@@ -237,56 +309,45 @@ class RAGPipelineValidator:
         logger.info("=" * 80)
         
         # Summary statistics
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results if result.get("validation", {}).get("passed", False))
+        modes = self._mode_counts
+        total_tests = sum(stats["total"] for stats in modes.values())
+        passed_tests = sum(stats["passed"] for stats in modes.values())
         failed_tests = total_tests - passed_tests
         
-        logger.info(f"\n📈 SUMMARY:")
-        logger.info(f"   Total Tests: {total_tests}")
-        logger.info(f"   Passed: {passed_tests} ({passed_tests/total_tests*100:.1f}%)")
-        logger.info(f"   Failed: {failed_tests} ({failed_tests/total_tests*100:.1f}%)")
+        logger.info("\n📈 SUMMARY:")
+        logger.info("   Total Tests: %d", total_tests)
+        logger.info("   Passed: %d (%.1f%%)", passed_tests, passed_tests/total_tests*100)
+        logger.info("   Failed: %d (%.1f%%)", failed_tests, failed_tests/total_tests*100)
         
         # Mode breakdown
-        modes = {}
-        for result in self.test_results:
-            mode = result["mode"]
-            if mode not in modes:
-                modes[mode] = {"total": 0, "passed": 0}
-            modes[mode]["total"] += 1
-            if result.get("validation", {}).get("passed", False):
-                modes[mode]["passed"] += 1
-                
-        logger.info(f"\n📊 BY MODE:")
+        logger.info("\n📊 BY MODE:")
         for mode, stats in modes.items():
             pass_rate = stats["passed"] / stats["total"] * 100 if stats["total"] > 0 else 0
-            logger.info(f"   {mode}: {stats['passed']}/{stats['total']} ({pass_rate:.1f}%)")
+            logger.info("   %s: %d/%d (%.1f%%)", mode, stats['passed'], stats['total'], pass_rate)
             
         # Failed tests details
         if failed_tests > 0:
-            logger.info(f"\n❌ FAILED TESTS:")
-            for result in self.test_results:
-                if not result.get("validation", {}).get("passed", False):
-                    logger.info(f"   • {result['query'][:60]}...")
-                    issues = result.get("validation", {}).get("issues", [])
-                    for issue in issues[:3]:  # Show first 3 issues
-                        logger.info(f"     - {issue}")
+            logger.info("\n❌ FAILED TESTS:")
+            for query, issues in self._failures:
+                logger.info("   • %s...", query[:60])
+                for issue in issues:  # First 3 issues, kept by _record_result
+                    logger.info("     - %s", issue)
                         
         # Performance metrics
-        execution_times = [r.get("execution_time", 0) for r in self.test_results if "execution_time" in r]
-        if execution_times:
-            avg_time = sum(execution_times) / len(execution_times)
-            max_time = max(execution_times)
-            min_time = min(execution_times)
+        avg_time = max_time = min_time = 0
+        if self._exec_count:
+            avg_time = self._exec_total_ns / self._exec_count / 1e9
+            max_time = self._exec_max_ns / 1e9
+            min_time = self._exec_min_ns / 1e9
             
-            logger.info(f"\n⏱️  PERFORMANCE:")
-            logger.info(f"   Average Response Time: {avg_time:.2f}s")
-            logger.info(f"   Fastest Response: {min_time:.2f}s")
-            logger.info(f"   Slowest Response: {max_time:.2f}s")
+            logger.info("\n⏱️  PERFORMANCE:")
+            logger.info("   Average Response Time: %.2fs", avg_time)
+            logger.info("   Fastest Response: %.2fs", min_time)
+            logger.info("   Slowest Response: %.2fs", max_time)
             
-        # Save detailed report
-        report_file = f"rag_validation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_file, 'w') as f:
-            json.dump({
+        # Save summary report; per-test details are already in the NDJSON file
+        with open(self.report_file, 'wb') as f:
+            f.write(_json_bytes({
                 "summary": {
                     "total_tests": total_tests,
                     "passed_tests": passed_tests,
@@ -295,27 +356,42 @@ class RAGPipelineValidator:
                 },
                 "mode_breakdown": modes,
                 "performance": {
-                    "avg_time": avg_time if execution_times else 0,
-                    "max_time": max_time if execution_times else 0,
-                    "min_time": min_time if execution_times else 0
+                    "avg_time": avg_time,
+                    "max_time": max_time,
+                    "min_time": min_time
                 },
-                "detailed_results": self.test_results,
+                "issue_counts": dict(self._issue_counts.most_common()),
+                "results_window": {
+                    "first": _iso_utc(self._results_window_ns[0]),
+                    "last": _iso_utc(self._results_window_ns[1])
+                } if self._results_window_ns else None,
+                "detailed_results_file": self.results_file,
                 "timestamp": datetime.now().isoformat()
-            }, f, indent=2)
+            }, indent=True))
             
-        logger.info(f"\n💾 Detailed report saved to: {report_file}")
+        logger.info("\n💾 Summary report saved to: %s", self.report_file)
+        logger.info("💾 Detailed results saved to: %s", self.results_file)
         logger.info("=" * 80)
 
 async def main():
     """Main test execution function"""
+    parser = argparse.ArgumentParser(description="Validate the RAG + MCP pipeline")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Query the agent for every test instead of reusing cached responses")
+    args = parser.parse_args()
+    
     # You would replace this with your actual OpenAI API key
     api_key = os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
     
     if api_key == "your-openai-api-key-here":
         logger.warning("⚠️  Using placeholder API key. Set OPENAI_API_KEY environment variable for actual testing.")
         
-    validator = RAGPipelineValidator(api_key)
-    await validator.run_all_tests()
+    validator = RAGPipelineValidator(api_key, use_cache=not args.no_cache)
+    try:
+        async with validator.agent:
+            await validator.run_all_tests()
+    finally:
+        validator.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,30 @@
+"""
+Prompt token counting shared by the ARGO agents.
+
+Uses tiktoken when it is installed; otherwise estimates ~4 characters per
+token, which is close enough for budgeting prompts and trimming history.
+"""
+
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+@lru_cache(maxsize=None)
+def _token_encoding(model: str):
+    """Return the tiktoken encoding for a model, or None if unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str, model: str) -> int:
+    """Count prompt tokens, estimating ~4 characters per token without tiktoken"""
+    encoding = _token_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
@@ -60,6 +60,16 @@ class ARGOMCPServer {
               ],
             }
 
+          case "hybridARGO":
+            return {
+              content: [
+                {
+                  type: "text",
+                  text: JSON.stringify(await this.argoTools.executeHybridARGO(args), null, 2),
+                },
+              ],
+            }
+
           case "getARGOByLocation":
             return {
               content: [
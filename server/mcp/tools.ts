@@ -57,10 +57,55 @@ export class ARGOTools {
               description: "Maximum number of results to return (default: 10)",
               default: 10,
             },
+            queryEmbedding: {
+              type: "array",
+              items: { type: "number" },
+              description:
+                "Optional precomputed embedding of the query, used instead of embedding it again when its dimension matches the index",
+            },
           },
           required: ["query"],
         },
       },
+      {
+        name: "hybridARGO",
+        description:
+          "Run a SQL query and a semantic vector search on Indian Ocean ARGO profiles in one call. Use when a question has both structured conditions and a natural language description.",
+        inputSchema: {
+          type: "object",
+          properties: {
+            sql: {
+              type: "string",
+              description: "SQL query to execute on argo_profiles table (same columns as queryARGO)",
+            },
+            query: {
+              type: "string",
+              description: "Natural language query for the semantic vector search",
+            },
+            limit: {
+              type: "number",
+              description: "Maximum number of semantic search results (default: 10)",
+              default: 10,
+            },
+            queryEmbedding: {
+              type: "array",
+              items: { type: "number" },
+              description: "Optional precomputed embedding of the query (see retrieveARGO)",
+            },
+            page: {
+              type: "number",
+              description: "Page number for SQL result pagination (default: 1)",
+              default: 1,
+            },
+            pageSize: {
+              type: "number",
+              description: "Number of SQL results per page (default: 100, max: 1000)",
+              default: 100,
+            },
+          },
+          required: ["sql", "query"],
+        },
+      },
       {
         name: "getARGOByMonsoon",
         description: "Find ARGO profiles during specific monsoon periods in the Indian Ocean",
@@ -222,10 +267,10 @@ export class ARGOTools {
     const startTime = Date.now()
 
     try {
-      const { query, limit = 10 } = args
+      const { query, limit = 10, queryEmbedding } = args
 
       // Perform vector search
-      const result = await this.vectorSearch.search(query, limit)
+      const result = await this.vectorSearch.search(query, limit, queryEmbedding)
 
       const executionTime = Date.now() - startTime
 
@@ -253,6 +298,32 @@ export class ARGOTools {
     }
   }
 
+  async executeHybridARGO(args: any): Promise<MCPToolResponse> {
+    const startTime = Date.now()
+    const { sql, query, limit = 10, page = 1, pageSize = 100, queryEmbedding } = args
+
+    // Both searches run concurrently; each reports its own success and errors
+    const [sqlResult, semanticResult] = await Promise.all([
+      this.executeQueryARGO({ sql, page, pageSize }),
+      this.executeRetrieveARGO({ query, limit, queryEmbedding }),
+    ])
+
+    const executionTime = Date.now() - startTime
+
+    return {
+      success: sqlResult.success || semanticResult.success,
+      data: {
+        sql: sqlResult,
+        semantic: semanticResult,
+      },
+      metadata: {
+        timestamp: new Date().toISOString(),
+        source: "hybrid",
+        execution_time: executionTime,
+      },
+    }
+  }
+
   async executeGetARGOByMonsoon(args: any): Promise<MCPToolResponse> {
     const startTime = Date.now()
 
@@ -46,7 +46,7 @@ export class FAISSVectorSearch {
     }
   }
 
-  async search(query: string, k = 10): Promise<VectorSearchResult> {
+  async search(query: string, k = 10, queryEmbedding?: number[]): Promise<VectorSearchResult> {
     const startTime = Date.now()
 
     if (!this.isInitialized) {
@@ -54,8 +54,12 @@ export class FAISSVectorSearch {
     }
 
     try {
-      // Convert query to vector (simplified - in practice, you'd use embeddings)
-      const queryVector = this.queryToVector(query)
+      // Reuse the caller's embedding when it fits the index; otherwise convert
+      // the query to a vector (simplified - in practice, you'd use embeddings)
+      const queryVector =
+        queryEmbedding && queryEmbedding.length === this.index.getDimension()
+          ? Float32Array.from(queryEmbedding)
+          : this.queryToVector(query)
 
       // Perform similarity search
       const results = this.index.search(queryVector, Math.min(k, this.profiles.length))
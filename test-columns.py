@@ -7,53 +7,51 @@ key: str = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJlZiI
 # Initialize the Supabase client
 supabase: Client = create_client(url, key)
 
+# Columns to probe, each with a lowercase fallback name where one is worth trying
+BASIC_COLUMNS = ("file", "juld", "DATE", "LATITUDE", "LONGITUDE")
+PROBED_COLUMNS = (
+    ("shallow_TEMP_mean", "shallow_temp_mean"),
+    ("PROFILE_TEMP_QC", "profile_temp_qc"),
+)
+
 def test_columns():
-    # Test basic columns first
+    # Fetch one full row and answer every column probe from its keys,
+    # instead of a round trip per probe
     try:
-        response = supabase.table("argo_profiles").select("file, juld, DATE, LATITUDE, LONGITUDE").limit(1).execute()
-        print("✅ Basic columns work:", list(response.data[0].keys()) if response.data else "No data")
+        response = supabase.table("argo_profiles").select("*").limit(1).execute()
     except Exception as e:
-        print("❌ Basic columns failed:", str(e))
+        print("❌ Failed to get all columns:", str(e))
+        return
     
-    # Test temperature columns
-    try:
-        response = supabase.table("argo_profiles").select("shallow_TEMP_mean").limit(1).execute()
-        print("✅ shallow_TEMP_mean works")
-    except Exception as e:
-        print("❌ shallow_TEMP_mean failed:", str(e))
-        
-        # Try alternative name
-        try:
-            response = supabase.table("argo_profiles").select("shallow_temp_mean").limit(1).execute()
-            print("✅ shallow_temp_mean (lowercase) works")
-        except Exception as e2:
-            print("❌ shallow_temp_mean (lowercase) also failed:", str(e2))
+    if not response.data:
+        print("❌ No data found")
+        return
     
-    # Test QC columns
-    try:
-        response = supabase.table("argo_profiles").select("PROFILE_TEMP_QC").limit(1).execute()
-        print("✅ PROFILE_TEMP_QC works")
-    except Exception as e:
-        print("❌ PROFILE_TEMP_QC failed:", str(e))
-        
-        # Try alternative name
-        try:
-            response = supabase.table("argo_profiles").select("profile_temp_qc").limit(1).execute()
-            print("✅ profile_temp_qc (lowercase) works")
-        except Exception as e2:
-            print("❌ profile_temp_qc (lowercase) also failed:", str(e2))
-
-    # Get all column names from first row
-    try:
-        response = supabase.table("argo_profiles").select("*").limit(1).execute()
-        if response.data:
-            print("\n📋 All available columns:")
-            for i, col in enumerate(response.data[0].keys(), 1):
-                print(f"  {i:2d}. {col}")
+    columns = list(response.data[0].keys())
+    available = set(columns)
+    
+    # Test basic columns first
+    missing = [col for col in BASIC_COLUMNS if col not in available]
+    if missing:
+        print("❌ Basic columns failed, missing:", ", ".join(missing))
+    else:
+        print("✅ Basic columns work:", list(BASIC_COLUMNS))
+    
+    # Test temperature and QC columns
+    for name, fallback in PROBED_COLUMNS:
+        if name in available:
+            print(f"✅ {name} works")
+        elif fallback in available:
+            print(f"❌ {name} not found")
+            print(f"✅ {fallback} (lowercase) works")
         else:
-            print("❌ No data found")
-    except Exception as e:
-        print("❌ Failed to get all columns:", str(e))
+            print(f"❌ {name} not found")
+            print(f"❌ {fallback} (lowercase) also not found")
+    
+    # List all column names from the first row
+    print("\n📋 All available columns:")
+    for i, col in enumerate(columns, 1):
+        print(f"  {i:2d}. {col}")
 
 if __name__ == "__main__":
     test_columns()